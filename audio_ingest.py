@@ -0,0 +1,136 @@
+import queue
+import subprocess
+import threading
+from collections import deque
+import numpy as np
+
+# Configuration
+SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono
+CHUNK_SECONDS = 30  # Matches Whisper's native window
+READ_SECONDS = 1  # Granularity of pipe reads
+QUEUE_CHUNKS = 8  # Decoded chunks buffered ahead of the transcriber
+SPLIT_SEARCH = 2.0  # Seconds at the end of a chunk searched for a quiet cut point
+SPLIT_FRAME = 0.1  # Seconds per energy frame when searching
+STDERR_TAIL = 20  # Last ffmpeg stderr lines kept for the error message
+
+def ffmpeg_pcm_command(path, sample_rate=SAMPLE_RATE, channels=1):
+    """ffmpeg command that writes (interleaved) float32 PCM to stdout"""
+    return [
+        'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', path,
+        '-vn', '-ac', str(channels), '-ar', str(sample_rate),
+        '-f', 'f32le', '-'
+    ]
+
+def load_audio(path, sample_rate=SAMPLE_RATE, channels=1):
+    """Decode a whole file's audio into a float32 array, straight from ffmpeg's stdout"""
+    result = subprocess.run(ffmpeg_pcm_command(path, sample_rate, channels), stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed on {path}: {result.stderr.decode(errors='replace').strip()}")
+    audio = np.frombuffer(result.stdout, dtype=np.float32)
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels)
+    return audio
+
+def _quiet_split(chunk, sample_rate):
+    """Index of the quietest frame near the end of the chunk, to avoid cutting words"""
+    frame = int(sample_rate * SPLIT_FRAME)
+    search = int(sample_rate * SPLIT_SEARCH)
+    if len(chunk) < search + frame:
+        return len(chunk)
+    tail = chunk[-search:]
+    n = len(tail) // frame
+    energy = np.mean(tail[:n * frame].reshape(n, frame) ** 2, axis=1)
+    return len(chunk) - search + int(np.argmin(energy)) * frame + frame // 2
+
+def stream_audio(path, chunk_seconds=CHUNK_SECONDS, sample_rate=SAMPLE_RATE):
+    """
+    Yield float32 chunks as ffmpeg decodes them; a reader thread keeps the pipe drained.
+    Raises RuntimeError if ffmpeg fails, like load_audio, instead of ending quietly.
+    """
+    proc = subprocess.Popen(ffmpeg_pcm_command(path, sample_rate),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    blocks = queue.Queue(maxsize=max(1, int(QUEUE_CHUNKS * chunk_seconds / READ_SECONDS)))
+    read_bytes = int(sample_rate * READ_SECONDS) * 4
+    stop = threading.Event()
+    # Damaged captures make ffmpeg chatty; an unread stderr pipe would fill up and stall stdout
+    errors = deque(maxlen=STDERR_TAIL)
+
+    def reader():
+        while True:
+            try:
+                data = proc.stdout.read(read_bytes)
+            except ValueError:
+                return  # Pipe closed by the consumer
+            while True:
+                try:
+                    blocks.put(data, timeout=0.2)
+                    break
+                except queue.Full:
+                    if stop.is_set():
+                        return  # Consumer gone, nobody will empty the queue
+            if not data:
+                return
+
+    def drain_stderr():
+        for line in proc.stderr:
+            errors.append(line.decode(errors='replace').rstrip())
+
+    threading.Thread(target=reader, daemon=True).start()
+    stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+    stderr_thread.start()
+
+    chunk_samples = int(sample_rate * chunk_seconds)
+    pending = []
+    pending_len = 0
+    leftover = b""
+    finished = False
+    try:
+        while True:
+            data = blocks.get()
+            if not data:
+                break  # EOF: ffmpeg has closed stdout
+            # Keep reads aligned to whole float32 samples
+            data = leftover + data
+            usable = len(data) - len(data) % 4
+            leftover = data[usable:]
+            samples = np.frombuffer(data[:usable], dtype=np.float32)
+            pending.append(samples)
+            pending_len += len(samples)
+
+            # One read can hold several chunks when chunk_seconds < READ_SECONDS
+            while pending_len >= chunk_samples:
+                audio = np.concatenate(pending)
+                cut = _quiet_split(audio[:chunk_samples], sample_rate)
+                yield audio[:cut]
+                pending = [audio[cut:]]
+                pending_len = len(pending[0])
+
+        if proc.wait() != 0:
+            stderr_thread.join(timeout=1)
+            raise RuntimeError(f"ffmpeg failed on {path}: " + "\n".join(errors))
+        if pending_len:
+            yield np.concatenate(pending)
+        finished = True
+    finally:
+        stop.set()
+        if not finished:
+            proc.kill()  # Consumer stopped early, or ffmpeg failed
+        proc.stdout.close()
+        proc.wait()
+        stderr_thread.join(timeout=1)
+
+def transcribe_stream(model, path, chunk_seconds=CHUNK_SECONDS, stats=None, **transcribe_kwargs):
+    """Yield segment dicts with absolute times while the audio is still being extracted"""
+    offset = 0.0
+    for chunk in stream_audio(path, chunk_seconds):
+        segments, info = model.transcribe(chunk, **transcribe_kwargs)
+        for segment in segments:
+            yield {
+                'start': offset + segment.start,
+                'end': offset + segment.end,
+                'text': segment.text
+            }
+        offset += len(chunk) / SAMPLE_RATE
+        if stats is not None:
+            stats['audio_seconds'] = offset
@@ -2,107 +2,155 @@ import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 import cv2
-from faster_whisper import WhisperModel
-import subprocess
+import numpy as np
+from bisect import bisect_right
+from collections import OrderedDict
+from whisper_registry import get_model
+from audio_ingest import transcribe_stream
+from transcript_cache import TranscriptCache
+from render_pipeline import render_video, RENDER_WORKERS
+from subtitles import write_srt, write_ass, burn_subtitles, mux_soft_subtitles
 
 # Configuration
 VIDEO_PATH = "input_vids/122_starting.mp4"  # Change this to your video path
 OUTPUT_PATH = "output_vids/122_starting_transcribed.mp4"
 WHISPER_MODEL = "tiny"  # Options: tiny, base, small, medium, large-v3
+BEAM_SIZE = 5
+CAPTION_MODE = "overlay"  # "overlay" (per-frame OpenCV), "burn" (one ffmpeg pass) or "soft" (subtitle track, no re-encode)
+ENCODER = "opencv"  # "opencv" (mp4v, no audio) or "ffmpeg" (x264 + source audio)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.8
+FONT_THICKNESS = 2
+PATCH_CACHE = 4  # Rendered caption boxes kept; the cursor only moves forward, so old ones are dropped
 
-def extract_audio(video_path):
-    """Extract audio from video to temp file"""
-    audio_path = "temp_audio.wav"
-    cmd = [
-        'ffmpeg', '-i', video_path,
-        '-vn', '-acodec', 'pcm_s16le',
-        '-ar', '16000', '-ac', '1',
-        audio_path, '-y'
-    ]
-    subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    return audio_path
+# Transcripts keyed by video content + Whisper settings
+TRANSCRIPT_CACHE = TranscriptCache()
 
-def transcribe_audio(audio_path):
-    """Transcribe audio using faster-whisper"""
-    print("Loading Whisper model...")
-    model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
+def transcribe_audio(video_path):
+    """Transcribe audio using faster-whisper, streaming PCM from ffmpeg as it decodes"""
+    def run_whisper(path):
+        model = get_model(WHISPER_MODEL)  # Shared, loaded and warmed once per process
+        print("Transcribing audio...")
+        transcriptions = []
+        for segment in transcribe_stream(model, path, beam_size=BEAM_SIZE):
+            transcriptions.append(segment)
+            print(f"[{segment['start']:.2f}s -> {segment['end']:.2f}s] {segment['text']}")
+        return transcriptions
     
-    print("Transcribing audio...")
-    segments, info = model.transcribe(audio_path, beam_size=5)
+    settings = {"model": WHISPER_MODEL, "beam_size": BEAM_SIZE, "language": None}
+    return TRANSCRIPT_CACHE.transcribe(video_path, settings, run_whisper)
+
+class CaptionTrack:
+    """Transcript segments sorted by start time, looked up with a moving cursor"""
+    
+    def __init__(self, transcriptions, width, height):
+        self.segments = sorted(transcriptions, key=lambda t: t['start'])
+        self.starts = [t['start'] for t in self.segments]
+        self.width = width
+        self.height = height
+        self.cursor = -1  # Index of the last segment starting at or before the previous lookup
+        self.last_time = float('-inf')
+        self.patches = OrderedDict()  # Segment index -> pre-rendered text box, least recently used first
+    
+    def active(self, current_time):
+        """Index of the segment covering current_time, or None"""
+        if current_time < self.last_time:
+            # Seeking backwards: re-find the cursor by bisection
+            self.cursor = bisect_right(self.starts, current_time) - 1
+        else:
+            while self.cursor + 1 < len(self.starts) and self.starts[self.cursor + 1] <= current_time:
+                self.cursor += 1
+        self.last_time = current_time
+        
+        if self.cursor >= 0 and current_time <= self.segments[self.cursor]['end']:
+            return self.cursor
+        return None
+    
+    def _render(self, text):
+        """Render the black box with white text once; same pixels as drawing it on the frame"""
+        text_size = cv2.getTextSize(text, FONT, FONT_SCALE, FONT_THICKNESS)[0]
+        x0, y0 = 10, self.height - 60
+        x1, y1 = min(text_size[0] + 20, self.width - 1), self.height - 10
+        patch = np.zeros((y1 - y0 + 1, x1 - x0 + 1, 3), dtype=np.uint8)
+        cv2.putText(patch, text, (15 - x0, self.height - 25 - y0),
+                   FONT, FONT_SCALE, (255, 255, 255), FONT_THICKNESS)
+        return y0, x0, patch
     
-    transcriptions = []
-    for segment in segments:
-        transcriptions.append({
-            'start': segment.start,
-            'end': segment.end,
-            'text': segment.text
-        })
-        print(f"[{segment.start:.2f}s -> {segment.end:.2f}s] {segment.text}")
+    def box_at(self, current_time):
+        """Cached (y, x, patch) text box for current_time, or None"""
+        index = self.active(current_time)
+        if index is None or not self.segments[index]['text']:
+            return None
+        
+        if index in self.patches:
+            self.patches.move_to_end(index)
+        else:
+            self.patches[index] = self._render(self.segments[index]['text'])
+            if len(self.patches) > PATCH_CACHE:
+                self.patches.popitem(last=False)
+        return self.patches[index]
     
-    return transcriptions
+    def draw(self, frame, current_time):
+        """Paste the active caption box onto the frame, if any"""
+        box = self.box_at(current_time)
+        if box is not None:
+            paste_box(frame, box)
 
-def overlay_text_on_video(video_path, transcriptions, output_path):
-    """Add transcription overlay to video"""
+def paste_box(frame, box):
+    """Copy a pre-rendered text box into the frame"""
+    y0, x0, patch = box
+    frame[y0:y0 + patch.shape[0], x0:x0 + patch.shape[1]] = patch
+
+def overlay_text_on_video(video_path, transcriptions, output_path,
+                          workers=RENDER_WORKERS, encoder=ENCODER):
+    """Add transcription overlay to video (threaded decode / overlay / encode)"""
     cap = cv2.VideoCapture(video_path)
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
     
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    # Caption lookup runs in frame order on the decoder thread; workers only paste
+    captions = CaptionTrack(transcriptions, width, height)
     
-    frame_count = 0
     print("Processing video frames...")
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        current_time = frame_count / fps
-        
-        # Find active transcription for current time
-        current_text = ""
-        for trans in transcriptions:
-            if trans['start'] <= current_time <= trans['end']:
-                current_text = trans['text']
-                break
-        
-        # Draw text overlay
-        if current_text:
-            # Black background box for text
-            text_size = cv2.getTextSize(current_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-            box_coords = ((10, height - 60), (text_size[0] + 20, height - 10))
-            cv2.rectangle(frame, box_coords[0], box_coords[1], (0, 0, 0), -1)
-            
-            # White text
-            cv2.putText(frame, current_text, (15, height - 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        
-        out.write(frame)
-        frame_count += 1
-        
-        if frame_count % 100 == 0:
-            print(f"Processed {frame_count} frames...")
-    
-    cap.release()
-    out.release()
+    render_video(
+        video_path, output_path,
+        annotate=lambda index, fps: captions.box_at(index / fps),
+        apply=paste_box,
+        workers=workers,
+        encoder=encoder,
+    )
     print(f"Output saved to {output_path}")
 
-def main():
-    # Extract audio
-    audio_path = extract_audio(VIDEO_PATH)
-    
-    # Transcribe
-    transcriptions = transcribe_audio(audio_path)
+def caption_with_ffmpeg(video_path, transcriptions, output_path, mode):
+    """Caption via a subtitle file: burn in with one ffmpeg pass, or mux as a soft track"""
+    base = os.path.splitext(output_path)[0]
+    if mode == "burn":
+        cap = cv2.VideoCapture(video_path)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        subtitle_path = write_ass(transcriptions, base + ".ass", width, height)
+        ok = burn_subtitles(video_path, subtitle_path, output_path)
+    else:
+        subtitle_path = write_srt(transcriptions, base + ".srt")
+        ok = mux_soft_subtitles(video_path, subtitle_path, output_path)
     
-    # Overlay on video
-    overlay_text_on_video(VIDEO_PATH, transcriptions, OUTPUT_PATH)
+    if ok:
+        print(f"Output saved to {output_path} (subtitles: {subtitle_path})")
+    else:
+        print(f"ffmpeg failed to caption {video_path}")
+    return ok
+
+def main():
+    # Transcribe (audio is piped from ffmpeg, nothing written to disk)
+    transcriptions = transcribe_audio(VIDEO_PATH)
     
-    # Cleanup
-    if os.path.exists(audio_path):
-        os.remove(audio_path)
+    # Caption the video
+    if CAPTION_MODE == "overlay":
+        overlay_text_on_video(VIDEO_PATH, transcriptions, OUTPUT_PATH)
+    else:
+        caption_with_ffmpeg(VIDEO_PATH, transcriptions, OUTPUT_PATH, CAPTION_MODE)
     
     print("Done!")
 
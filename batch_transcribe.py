@@ -0,0 +1,134 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from audio_ingest import transcribe_stream
+from mood_matcher import MoodMatcher
+
+# Configuration
+INPUT_DIR = "input_vids"
+OUTPUT_DIR = "transcripts"
+WHISPER_MODEL = "base"
+BEAM_SIZE = 5
+THREADS_PER_WORKER = 2  # CTranslate2 threads per process; workers = cores // this
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi', '.webm', '.ts')
+
+# Same commentary vocabulary as full_pipeline_1.py
+MOOD_KEYWORDS = {
+    "excited": ["goal", "score", "amazing", "incredible", "wow", "brilliant", "fantastic"],
+    "sad": ["miss", "lost", "defeat", "disappointed", "unfortunate", "poor"],
+    "boring": ["slow", "uneventful", "nothing", "quiet", "waiting", "stalled"]
+}
+MOOD_MATCHER = MoodMatcher(MOOD_KEYWORDS)
+
+_worker_settings = {}
+
+def find_videos(input_dir):
+    """All video files under input_dir, sorted"""
+    videos = []
+    for root, dirs, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, name))
+    return sorted(videos)
+
+def output_paths(video_path, input_dir, output_dir):
+    """Transcript and mood timeline paths, mirroring the input folder layout"""
+    rel = os.path.splitext(os.path.relpath(video_path, input_dir))[0]
+    base = os.path.join(output_dir, rel)
+    return base + ".transcript.json", base + ".moods.json"
+
+def is_up_to_date(video_path, outputs):
+    """True if every output exists and is newer than the video"""
+    video_mtime = os.path.getmtime(video_path)
+    return all(os.path.exists(p) and os.path.getmtime(p) >= video_mtime for p in outputs)
+
+def detect_mood(transcriptions):
+    """Mood per segment, "boring" by default (same rules as full_pipeline_1.py)"""
+    return [{
+        'start': trans['start'],
+        'end': trans['end'],
+        'mood': MOOD_MATCHER.best_mood(trans['text']) or "boring",
+        'text': trans['text']
+    } for trans in transcriptions]
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+def _init_worker(model_size, cpu_threads, beam_size):
+    """Load this worker's own WhisperModel once, with its share of the cores"""
+    from whisper_registry import get_model
+    _worker_settings.update(model=get_model(model_size, cpu_threads=cpu_threads), beam_size=beam_size)
+
+def transcribe_file(video_path, transcript_path, moods_path):
+    """Worker: transcribe one video and write its transcript and mood timeline"""
+    start = time.monotonic()
+    stats = {}
+    transcriptions = []
+    for segment in transcribe_stream(_worker_settings['model'], video_path, stats=stats,
+                                     beam_size=_worker_settings['beam_size']):
+        segment['text'] = segment['text'].lower()
+        transcriptions.append(segment)
+
+    _write_json(transcript_path, transcriptions)
+    _write_json(moods_path, detect_mood(transcriptions))
+    return video_path, stats.get('audio_seconds', 0.0), time.monotonic() - start
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Transcribe a folder of match videos in parallel")
+    parser.add_argument("--input", default=INPUT_DIR)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--beam-size", type=int, default=BEAM_SIZE)
+    parser.add_argument("--threads-per-worker", type=int, default=THREADS_PER_WORKER)
+    parser.add_argument("--workers", type=int, default=None, help="default: cores // threads-per-worker")
+    parser.add_argument("--force", action="store_true", help="re-transcribe up-to-date files")
+    args = parser.parse_args()
+
+    workers = args.workers or max(1, cores // args.threads_per_worker)
+
+    jobs = []
+    skipped = 0
+    for video_path in find_videos(args.input):
+        outputs = output_paths(video_path, args.input, args.output)
+        if not args.force and is_up_to_date(video_path, outputs):
+            skipped += 1
+            continue
+        jobs.append((video_path,) + outputs)
+
+    print(f"📂 {len(jobs)} videos to transcribe, {skipped} up to date "
+          f"({workers} workers × {args.threads_per_worker} threads)")
+    if not jobs:
+        return
+
+    start = time.monotonic()
+    total_audio = 0.0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                             initargs=(args.model, args.threads_per_worker, args.beam_size)) as pool:
+        futures = {pool.submit(transcribe_file, *job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                video_path, audio_seconds, elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future]}: {e}")
+                continue
+            total_audio += audio_seconds
+            speed = audio_seconds / elapsed if elapsed > 0 else 0.0
+            print(f"✓ {video_path}: {audio_seconds:.0f}s audio in {elapsed:.1f}s ({speed:.1f}x)")
+
+    wall = time.monotonic() - start
+    print(f"\n⏱️  {len(jobs) - failed}/{len(jobs)} videos, {total_audio:.0f}s of audio in {wall:.1f}s "
+          f"= {total_audio / wall if wall > 0 else 0:.1f} audio-seconds per wall-second")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import argparse
+import glob
+import time
+from audio_ingest import load_audio, SAMPLE_RATE
+from decoding_profiles import DECODING_PROFILES, transcribe_with_profile
+from vdm_music_image import MOOD_KEYWORDS, MOOD_MATCHER
+from whisper_registry import get_model
+
+# Configuration
+CLIPS_DIR = "reaction_clips"  # clip.wav + clip.txt (reference transcript) pairs
+WHISPER_MODEL = "base"
+CHUNK_DURATION = 5  # Same chunking as the live scripts
+
+def load_clips(clips_dir):
+    """[(name, audio, reference keywords)] for every clip with a reference transcript"""
+    clips = []
+    for audio_path in sorted(glob.glob(os.path.join(clips_dir, "*.wav"))):
+        ref_path = os.path.splitext(audio_path)[0] + ".txt"
+        if not os.path.exists(ref_path):
+            print(f"⚠️  No reference transcript for {audio_path}, skipping")
+            continue
+        with open(ref_path, encoding='utf-8') as f:
+            reference = f.read()
+        keywords = [hit.keyword for hit in MOOD_MATCHER.find(reference)]
+        clips.append((os.path.basename(audio_path), load_audio(audio_path), keywords))
+    return clips
+
+def _multiset_overlap(expected, found):
+    remaining = list(found)
+    matched = 0
+    for keyword in expected:
+        if keyword in remaining:
+            remaining.remove(keyword)
+            matched += 1
+    return matched
+
+def bench_profile(model, clips, profile, chunk_duration=CHUNK_DURATION):
+    """Latency per chunk and keyword recall/precision for one profile"""
+    chunk = int(SAMPLE_RATE * chunk_duration)
+    latencies = []
+    audio_seconds = 0.0
+    expected_total = found_total = matched_total = 0
+
+    for name, audio, expected in clips:
+        texts = []
+        for start in range(0, len(audio), chunk):
+            piece = audio[start:start + chunk]
+            t0 = time.perf_counter()
+            texts.append(transcribe_with_profile(model, piece, profile, MOOD_KEYWORDS))
+            latencies.append(time.perf_counter() - t0)
+            audio_seconds += len(piece) / SAMPLE_RATE
+
+        found = [hit.keyword for hit in MOOD_MATCHER.find(" ".join(texts))]
+        expected_total += len(expected)
+        found_total += len(found)
+        matched_total += _multiset_overlap(expected, found)
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "rtf": sum(latencies) / audio_seconds if audio_seconds else 0.0,
+        "recall": matched_total / expected_total if expected_total else 1.0,
+        "precision": matched_total / found_total if found_total else 1.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare live decoding profiles on recorded reaction audio")
+    parser.add_argument("--clips", default=CLIPS_DIR)
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--profiles", nargs="+", default=list(DECODING_PROFILES))
+    parser.add_argument("--chunk", type=float, default=CHUNK_DURATION)
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    if not clips:
+        print(f"No clips found in {args.clips} (expected clip.wav + clip.txt pairs)")
+        return
+
+    model = get_model(args.model)
+    print(f"🎧 {len(clips)} clips, {args.chunk}s chunks, model '{args.model}'\n")
+    print(f"{'profile':<10} {'p50 ms':>8} {'p95 ms':>8} {'RTF':>6} {'recall':>7} {'precision':>9}")
+    for profile in args.profiles:
+        r = bench_profile(model, clips, profile, args.chunk)
+        print(f"{r['profile']:<10} {r['p50'] * 1000:8.0f} {r['p95'] * 1000:8.0f} {r['rtf']:6.3f} "
+              f"{r['recall']:7.2f} {r['precision']:9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import argparse
+import bisect
+import json
+import tempfile
+import time
+import numpy as np
+import vdm_music_image as live
+from bench_decoding import CLIPS_DIR, load_clips, _multiset_overlap
+from daydream_client import DaydreamClient, UNCHANGED
+from daydream_stub import DaydreamStub, STUB_LATENCY
+from keyword_spotter import KeywordSpotter, SPOTTER_MODEL
+from live_audio import PushRecorder, transcribe_chunk
+from live_pipeline import LivePipeline, StageStats
+from mood_dispatcher import MoodDispatcher
+from mood_music import MoodMusicEngine
+from mood_smoother import MoodSmoother
+from obs_overlay import ObsOverlayPublisher
+from streaming_transcribe import StableText, StreamingTranscriber, VAD_FRAME, VAD_THRESHOLD_DB
+from decoding_profiles import whisper_options
+from whisper_registry import get_model, model_metrics
+
+# Configuration
+SAMPLE_RATE = 16000
+SPEED = 1.0  # 1.0 = real time; higher replays faster (latencies then include backlog)
+FEED_BLOCK = 0.1  # Seconds per pushed block, like a mic callback
+CLIP_GAP = 2.0  # Seconds of silence between clips
+ONSET_GAP = 0.3  # Silence before voiced audio that marks a new utterance
+DRAIN_TIMEOUT = 30.0  # Seconds to wait for the pipeline to finish after the last block
+
+def speech_onsets(audio, sample_rate=SAMPLE_RATE):
+    """Sample positions where speech starts after at least ONSET_GAP of silence (energy VAD)"""
+    frame = int(sample_rate * VAD_FRAME)
+    n = len(audio) // frame
+    if n == 0:
+        return []
+    frames = audio[:n * frame].reshape(n, frame)
+    voiced = 20 * np.log10(np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)) > VAD_THRESHOLD_DB
+    gap_frames = int(ONSET_GAP / VAD_FRAME)
+    onsets = []
+    silent = gap_frames
+    for i, v in enumerate(voiced):
+        if v and silent >= gap_frames:
+            onsets.append(i * frame)
+        silent = 0 if v else silent + 1
+    return onsets
+
+class _Text(StableText):
+    """Transcript tagged with the time its audio finished capturing"""
+    captured_at = None
+
+def build_transcriber(mode, recorder, model, spotter_model):
+    """(capture, transcribe) exactly as vdm_music_image.py wires them"""
+    if mode == "streaming":
+        streamer = StreamingTranscriber(recorder, model, live.WINDOW_DURATION, live.HOP_DURATION,
+                                        whisper_options(live.LIVE_PROFILE, live.MOOD_KEYWORDS),
+                                        context_words=live.MOOD_MATCHER.max_depth - 1)
+        return streamer.next_window, streamer.transcribe_window
+    capture = lambda: recorder.get_audio_chunk(live.CHUNK_DURATION)
+    if mode == "spotter":
+        spotter = KeywordSpotter(spotter_model, model, live.MOOD_KEYWORDS, SAMPLE_RATE, live.LIVE_PROFILE)
+        return capture, spotter.transcribe
+    return capture, lambda audio: transcribe_chunk(audio, model, live.LIVE_PROFILE, live.MOOD_KEYWORDS)
+
+def replay(clips, model, mode="streaming", speed=SPEED, stub_latency=STUB_LATENCY, spotter_model=None):
+    """Run the live loop over recorded clips against a local stub; returns a results dict"""
+    stub = DaydreamStub(port=0, latency=stub_latency).start()
+    client = DaydreamClient("bench", stub.url)
+    stream_id = client.create_stream("pip_SD-turbo").json()['id']
+
+    gap = np.zeros(int(CLIP_GAP * SAMPLE_RATE), dtype=np.float32)
+    audio = np.concatenate([part for _, clip, _ in clips for part in (clip, gap)])
+    onsets = speech_onsets(audio)
+    audio_seconds = len(audio) / SAMPLE_RATE
+
+    recorder = PushRecorder(SAMPLE_RATE)
+    capture, transcribe = build_transcriber(mode, recorder, model, spotter_model)
+    smoother = MoodSmoother()
+    onset_times = []
+    pending_onset = {}  # mood -> speech onset (monotonic) of the utterance that caused it
+    decided = {"mood": "neutral"}
+    transcripts = []
+    in_flight = [0]
+    end_to_end = StageStats()
+
+    def tagged_capture():
+        item = capture()
+        if item is None:
+            if not recorder.is_recording:
+                time.sleep(0.05)  # Replay finished; don't spin until the pipeline stops
+            return None
+        return time.monotonic(), item
+
+    def tagged_transcribe(tagged):
+        captured_at, item = tagged
+        in_flight[0] += 1
+        try:
+            text = transcribe(item)
+        finally:
+            in_flight[0] -= 1
+        if text is None:
+            return None
+        if text:
+            transcripts.append(text)
+        text = _Text(text, getattr(text, "context", ""))
+        text.captured_at = captured_at
+        return text
+
+    def detect(text):
+        mood = smoother.update(live.detect_mood_from_text(text))
+        if mood != decided["mood"]:
+            decided["mood"] = mood
+            i = bisect.bisect_right(onset_times, text.captured_at)
+            if i:
+                pending_onset[mood] = onset_times[i - 1]
+        return mood
+
+    def idle():
+        mood = smoother.tick()
+        if mood != decided["mood"]:
+            decided["mood"] = mood
+            pending_onset.pop(mood, None)  # Timed out, not caused by speech
+        return mood
+
+    def send(stream_id, mood):
+        onset = pending_onset.pop(mood, None)
+        response = client.update_stream(stream_id, live.MOOD_STYLES[mood], label=mood)
+        if onset is not None and response is not UNCHANGED:
+            with stub.lock:
+                patched = [t for t, method, _, _ in stub.requests if method == "PATCH"]
+            end_to_end.record(patched[-1] - onset)
+        return response is UNCHANGED or (response is not None and response.status_code == 200)
+
+    dispatcher = MoodDispatcher(send)
+    overlay_dir = tempfile.mkdtemp(prefix="bench_overlay_")
+    overlays = ObsOverlayPublisher(os.path.join(overlay_dir, live.MOOD_TEXT_FILE),
+                                   os.path.join(overlay_dir, live.MOOD_IMAGE_FILE), live.MOOD_IMAGES_FOLDER)
+    music = MoodMusicEngine(live.AUDIO_FOLDER, live.MOOD_STYLES, live.MUSIC_CROSSFADE, sink="null")
+    pipeline = LivePipeline(
+        tagged_capture,
+        tagged_transcribe,
+        detect_mood=detect,
+        actuators={
+            "daydream": lambda mood: dispatcher.submit(stream_id, mood),
+            "overlay": overlays.publish,
+            "music": music.play_mood,
+        },
+        on_idle=idle,
+    )
+    pipeline.apply_mood("neutral")
+    dispatcher.flush(5)
+
+    recorder.start_recording()
+    pipeline.start()
+    cpu_start = time.process_time()
+    feed_start = time.monotonic()
+    onset_times.extend(feed_start + s / SAMPLE_RATE / speed for s in onsets)
+
+    block = int(FEED_BLOCK * SAMPLE_RATE)
+    for pos in range(0, len(audio), block):
+        recorder.push(audio[pos:pos + block])
+        ahead = feed_start + (pos + block) / SAMPLE_RATE / speed - time.monotonic()
+        if ahead > 0:
+            time.sleep(ahead)
+
+    recorder.stop_recording()  # Lets the chunk reader take the final partial chunk
+
+    # Wait for everything already captured to come out the other end
+    hop = int(live.HOP_DURATION * SAMPLE_RATE)
+    deadline = time.monotonic() + DRAIN_TIMEOUT
+    while time.monotonic() < deadline and (recorder.write_pos - recorder.read_pos >= hop or in_flight[0]
+                                           or pipeline.audio_queue.qsize() or pipeline.text_queue.qsize()):
+        time.sleep(0.1)
+    time.sleep(0.5)  # Let the decide and actuator threads catch up
+    dispatcher.flush(5)
+    cpu = time.process_time() - cpu_start
+
+    pipeline.print_stats()
+    client.print_stats()
+    dispatcher.print_stats()
+    smoother.print_stats()
+    overlays.print_stats()
+    music.print_stats()
+
+    pipeline.stop()
+    dispatcher.stop()
+    music.stop()
+    stub.stop()
+
+    expected = [kw for _, _, keywords in clips for kw in keywords]
+    # Per emission, with the context it carried: exactly what detect_mood_from_text saw
+    found = [hit.keyword for text in transcripts
+             for hit in live.MOOD_MATCHER.find(text, getattr(text, "context", ""))]
+    e2e = end_to_end.summary()
+    stages = {name: stats.summary() for name, stats in pipeline.stats.items()}
+    return {
+        "mode": mode,
+        "speed": speed,
+        "audio_seconds": audio_seconds,
+        "cpu_per_audio_second": cpu / audio_seconds,
+        "end_to_end": e2e,
+        "stages": stages,
+        "patches": sum(1 for _, method, _, _ in stub.requests if method == "PATCH"),
+        "dropped_samples": recorder.dropped_samples,
+        "gap_samples": recorder.gap_samples,
+        "recall": _multiset_overlap(expected, found) / len(expected) if expected else 1.0,
+        "keywords_expected": len(expected),
+        "keywords_found": len(found),
+        "model_load": {"/".join(map(str, key)): timings for key, timings in model_metrics().items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded reactions through the live loop and measure latency")
+    parser.add_argument("--clips", default=CLIPS_DIR)
+    parser.add_argument("--model", default=live.WHISPER_MODEL)
+    parser.add_argument("--mode", choices=["streaming", "chunk", "spotter"],
+                        default="streaming" if live.STREAMING_MODE else "chunk")
+    parser.add_argument("--speed", type=float, default=SPEED, help="replay speed (1.0 = real time)")
+    parser.add_argument("--stub-latency", type=float, default=STUB_LATENCY)
+    parser.add_argument("--json", help="also write the results here, for run-to-run comparison")
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    if not clips:
+        print(f"No clips found in {args.clips} (expected clip.wav + clip.txt pairs)")
+        return
+
+    model = get_model(args.model)
+    spotter_model = get_model(SPOTTER_MODEL) if args.mode == "spotter" else None
+    print(f"🎧 Replaying {len(clips)} clips at {args.speed}× ({args.mode} mode, model '{args.model}')\n")
+    results = replay(clips, model, args.mode, args.speed, args.stub_latency, spotter_model)
+
+    e2e = results["end_to_end"]
+    print(f"\n🏁 Speech onset → PATCH: n={e2e['count']} p50={e2e['p50'] * 1000:.0f}ms "
+          f"p95={e2e['p95'] * 1000:.0f}ms max={e2e['max'] * 1000:.0f}ms")
+    print(f"   CPU: {results['cpu_per_audio_second']:.3f}s per audio second "
+          f"({results['audio_seconds']:.0f}s of audio)")
+    print(f"   Keyword recall: {results['recall']:.2f} "
+          f"({results['keywords_found']} found, {results['keywords_expected']} expected)")
+    print(f"   PATCHes sent: {results['patches']}, dropped audio samples: {results['dropped_samples']}")
+    for name, timings in results["model_load"].items():
+        warmup = timings["warmup_seconds"]
+        print(f"   Model {name}: load {timings['load_seconds']:.2f}s"
+              + (f", first inference {warmup:.2f}s" if warmup is not None else ""))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import argparse
+import json
+import time
+from daydream_client import DaydreamClient, UNCHANGED
+from daydream_stub import DaydreamStub, STUB_LATENCY
+from live_pipeline import StageStats
+from vdm_music_image import MOOD_STYLES
+
+# Configuration
+REPEATS = 5  # Timed switches per mood pair and mode
+ENCODE_COST = 0.15  # Stub seconds per prompt field sent, a rough stand-in for remote prompt re-encoding
+PIPELINE_ID = "pip_SD-turbo"
+
+def changed_fields(before, after):
+    return sorted(k for k, v in after.items() if before.get(k) != v)
+
+def params_merge(client, stream_id, styles):
+    """
+    Whether a PATCH with some params keeps the others (send_changed_only relies on it).
+    Checked with a GET after a partial update; None if the response shows no params.
+    """
+    first, second = list(styles)[:2]
+    full = dict(styles[first])
+    partial = {k: v for k, v in styles[second].items() if full.get(k) != v}
+    partial.pop("prompt", None)
+    for params in (full, partial):
+        response = client.request("PATCH", f"/streams/{stream_id}", json={"params": params})
+        if response is None or response.status_code != 200:
+            return None
+    response = client.get_stream(stream_id)
+    if response is None or response.status_code != 200:
+        return None
+    stored = response.json().get("params")
+    if not isinstance(stored, dict):
+        return None
+    return stored.get("prompt") == full["prompt"] and all(stored.get(k) == v for k, v in partial.items())
+
+def profile(client, stream_id, styles, repeats):
+    """Time every ordered mood switch a → b; returns {(a, b): StageStats}"""
+    results = {}
+    for a in styles:
+        for b in styles:
+            if a == b:
+                continue
+            stats = results[(a, b)] = StageStats()
+            for _ in range(repeats):
+                client.update_stream(stream_id, styles[a])  # Untimed: put the stream in mood a
+                start = time.monotonic()
+                response = client.update_stream(stream_id, styles[b])
+                if response is UNCHANGED:
+                    stats.record(time.monotonic() - start)
+                    continue
+                if response is None or response.status_code != 200:
+                    print(f"❌ {a} → {b} update failed")
+                    continue
+                stats.record(time.monotonic() - start)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Daydream PATCH latency for every mood → mood switch")
+    parser.add_argument("--url", help="Daydream API to profile (default: a local stub with an encode-cost model)")
+    parser.add_argument("--pipeline", default=PIPELINE_ID)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--stub-latency", type=float, default=STUB_LATENCY)
+    parser.add_argument("--encode-cost", type=float, default=ENCODE_COST)
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    stub = None
+    if args.url:
+        url, api_key = args.url, os.getenv("DAYDREAM_API_KEY")
+    else:
+        stub = DaydreamStub(port=0, latency=args.stub_latency, encode_cost=args.encode_cost).start()
+        url, api_key = stub.url, "bench"
+    client = DaydreamClient(api_key, url)
+    diff_client = DaydreamClient(api_key, url, send_changed_only=True)
+
+    response = client.create_stream(args.pipeline)
+    if response is None or response.status_code not in (200, 201):
+        print(f"❌ Could not create a stream: {response.status_code if response is not None else 'no response'}")
+        return
+    stream_id = response.json()["id"]
+    print(f"🎬 Profiling {len(MOOD_STYLES) * (len(MOOD_STYLES) - 1)} mood switches × {args.repeats} on {stream_id}\n")
+
+    merges = params_merge(client, stream_id, MOOD_STYLES)
+    if merges is None:
+        print("⚠️  Could not read params back; PATCH merge semantics unverified\n")
+    elif merges:
+        print("✓ PATCH merges params: send_changed_only is safe on this server\n")
+    else:
+        print("❌ PATCH replaces params: leave send_changed_only off (it would drop unchanged fields)\n")
+
+    full = profile(client, stream_id, MOOD_STYLES, args.repeats)
+    diffed = profile(diff_client, stream_id, MOOD_STYLES, args.repeats)
+    client.close()
+    diff_client.close()
+    if stub:
+        stub.stop()
+
+    rows = []
+    for (a, b), stats in full.items():
+        rows.append({
+            "from": a,
+            "to": b,
+            "fields": changed_fields(MOOD_STYLES[a], MOOD_STYLES[b]),
+            "full_p50": stats.summary()["p50"],
+            "changed_only_p50": diffed[(a, b)].summary()["p50"],
+        })
+
+    print(f"{'switch':<22} {'full':>8} {'changed':>8}  fields sent")
+    for row in rows:
+        print(f"{row['from'] + ' → ' + row['to']:<22} {row['full_p50'] * 1000:6.0f}ms "
+              f"{row['changed_only_p50'] * 1000:6.0f}ms  {', '.join(row['fields'])}")
+
+    ranked = sorted(rows, key=lambda row: row["changed_only_p50"])
+    print("\n⚡ Fastest switches: " + ", ".join(f"{r['from']} → {r['to']}" for r in ranked[:3]))
+    print("🐢 Slowest switches: " + ", ".join(f"{r['from']} → {r['to']}" for r in ranked[-3:]))
+    saved = sum(r["full_p50"] - r["changed_only_p50"] for r in rows) / len(rows)
+    print(f"📉 Sending only changed params saves {saved * 1000:.0f}ms per switch on average")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"params_merge": merges, "switches": rows}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import random
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import metrics
+from live_pipeline import StageStats
+
+# Configuration
+DAYDREAM_API_URL = os.getenv("DAYDREAM_API_URL", "https://api.daydream.live/v1")
+CONNECT_TIMEOUT = 3.05  # Seconds to establish TCP+TLS
+READ_TIMEOUT = 10  # Seconds to wait for a response
+MAX_RETRIES = 2  # Extra attempts after the first
+BACKOFF_BASE = 0.25  # Seconds, doubled per attempt, full jitter
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SEND_CHANGED_ONLY = False  # PATCH only changed params; needs a server that merges params (bench_transitions.py --url checks)
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+
+UNCHANGED = object()  # update_stream result when no param differs from the last accepted update
+
+def _never_sent(error):
+    """True only if the connection was never set up, so the server can't have seen the request"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class DaydreamClient:
+    """Keep-alive Daydream API client with timeouts, bounded retries and per-call latency stats"""
+
+    def __init__(self, api_key, base_url=DAYDREAM_API_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES, pool_size=4,
+                 send_changed_only=SEND_CHANGED_ONLY):
+        self.base_url = base_url.rstrip("/")
+        self.send_changed_only = send_changed_only
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {}
+        self.sent_params = {}  # stream id -> params the server last accepted
+        self.last_label = {}  # stream id -> label of the last accepted update
+        self.transitions = {}  # (from label, to label) -> StageStats
+        self.fields = {"sent": 0, "skipped": 0}
+
+    def _record(self, name, seconds):
+        if name not in self.stats:
+            self.stats[name] = StageStats()
+        self.stats[name].record(seconds)
+        metrics.observe(f"http {name}", seconds)
+
+    def _backoff(self, attempt):
+        time.sleep(random.uniform(0, BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method, path, **kwargs):
+        """Send a request; returns the final response, or None if every attempt failed"""
+        url = f"{self.base_url}{path}"
+        name = f"{method} {path.split('/')[1] if '/' in path else path}"
+        retry_any = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(f"{name} error", time.monotonic() - start)
+                # Non-idempotent calls (POST /streams) only retry when the request never left;
+                # a reset or disconnect after sending could otherwise create a second stream
+                if attempt < self.max_retries and (retry_any or _never_sent(e)):
+                    print(f"⚠️  {method} {url} failed ({e.__class__.__name__}), retrying...")
+                    self._backoff(attempt)
+                    continue
+                print(f"❌ {method} {url} failed: {e}")
+                return None
+
+            self._record(name, time.monotonic() - start)
+            if response.status_code in RETRY_STATUSES and retry_any and attempt < self.max_retries:
+                print(f"⚠️  {method} {url} returned {response.status_code}, retrying...")
+                self._backoff(attempt)
+                continue
+            return response
+        return None
+
+    def create_stream(self, pipeline_id):
+        """POST /streams"""
+        return self.request("POST", "/streams", json={"pipeline_id": pipeline_id})
+
+    def get_stream(self, stream_id):
+        """GET /streams/{id}"""
+        return self.request("GET", f"/streams/{stream_id}")
+
+    def update_stream(self, stream_id, params, label=None):
+        """
+        PATCH /streams/{id} with new pipeline params. With send_changed_only only fields that differ
+        from the last accepted update are sent, so unchanged prompts aren't re-encoded remotely, and
+        UNCHANGED is returned without a request if nothing differs.
+        `label` (e.g. the mood) keys the per-transition latency stats.
+        """
+        previous = self.sent_params.get(stream_id)
+        if self.send_changed_only and previous is not None:
+            changed = {k: v for k, v in params.items() if previous.get(k) != v}
+        else:
+            changed = dict(params)
+        self.fields["sent"] += len(changed)
+        self.fields["skipped"] += len(params) - len(changed)
+
+        if not changed:
+            return UNCHANGED
+
+        start = time.monotonic()
+        response = self.request("PATCH", f"/streams/{stream_id}", json={"params": changed})
+        if response is None or response.status_code != 200:
+            self.sent_params.pop(stream_id, None)  # Server state unknown: send everything next time
+            return response
+
+        self.sent_params[stream_id] = dict(previous or {}, **changed)
+        if label is not None:
+            pair = (self.last_label.get(stream_id), label)
+            if pair not in self.transitions:
+                self.transitions[pair] = StageStats()
+            self.transitions[pair].record(time.monotonic() - start)
+            self.last_label[stream_id] = label
+        return response
+
+    def print_stats(self):
+        """Print call latency per endpoint"""
+        print("📊 Daydream API latency (ms):")
+        for name, stats in sorted(self.stats.items()):
+            s = stats.summary()
+            print(f"   {name:<22} n={s['count']:<5} p50={s['p50'] * 1000:7.1f} "
+                  f"p95={s['p95'] * 1000:7.1f} max={s['max'] * 1000:7.1f}")
+        if self.fields["sent"] or self.fields["skipped"]:
+            print(f"   params: {self.fields['sent']} fields sent, {self.fields['skipped']} unchanged skipped")
+
+    def print_transitions(self):
+        """Print PATCH latency per label → label transition"""
+        print("📊 Daydream transition latency (ms):")
+        for (before, after), stats in sorted(self.transitions.items(), key=lambda item: str(item[0])):
+            s = stats.summary()
+            print(f"   {str(before):>9} → {after:<9} n={s['count']:<5} p50={s['p50'] * 1000:7.1f} "
+                  f"p95={s['p95'] * 1000:7.1f}")
+
+    def close(self):
+        self.session.close()
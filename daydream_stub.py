@@ -0,0 +1,125 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configuration
+STUB_PORT = 8765
+STUB_LATENCY = 0.05  # Seconds added to every response
+STUB_ENCODE_COST = 0.0  # Extra seconds per prompt field in a PATCH (the server re-encodes every prompt it is sent)
+PROMPT_FIELDS = ("prompt", "negative_prompt")
+
+class DaydreamStub:
+    """Local stand-in for the Daydream streams API (POST/PATCH/GET /v1/streams)"""
+
+    def __init__(self, port=STUB_PORT, latency=STUB_LATENCY, encode_cost=STUB_ENCODE_COST):
+        self.latency = latency
+        self.encode_cost = encode_cost
+        self.streams = {}
+        self.requests = []  # (monotonic time, method, path, body)
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _handle(self, method):
+                body = self._body() if method in ("POST", "PATCH") else {}
+                with stub.lock:
+                    stub.requests.append((time.monotonic(), method, self.path, body))
+                time.sleep(stub.latency + stub.patch_cost(method, body))
+                status, reply = stub.handle(method, self.path, body)
+                self._reply(status, reply)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PATCH(self):
+                self._handle("PATCH")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/v1"
+
+    def patch_cost(self, method, body):
+        """Simulated time to apply a PATCH: every prompt sent is re-encoded, changed or not"""
+        if method != "PATCH" or not self.encode_cost:
+            return 0.0
+        params = body.get("params", {})
+        return self.encode_cost * sum(1 for field in PROMPT_FIELDS if field in params)
+
+    def handle(self, method, path, body):
+        """Route a request; returns (status, json body)"""
+        parts = path.strip("/").split("/")
+        if parts[:2] != ["v1", "streams"]:
+            return 404, {"error": "not found"}
+
+        with self.lock:
+            if method == "POST" and len(parts) == 2:
+                stream_id = f"str_{uuid.uuid4().hex[:12]}"
+                stream = {
+                    "id": stream_id,
+                    "pipeline_id": body.get("pipeline_id"),
+                    "whip_url": f"http://127.0.0.1:{self.port}/whip/{stream_id}",
+                    "output_playback_id": uuid.uuid4().hex[:16],
+                    "params": {},
+                }
+                self.streams[stream_id] = stream
+                return 201, stream
+
+            stream = self.streams.get(parts[2]) if len(parts) == 3 else None
+            if stream is None:
+                return 404, {"error": "stream not found"}
+            if method == "PATCH":
+                stream["params"].update(body.get("params", {}))
+            return 200, stream
+
+    def start(self):
+        """Serve on a background thread"""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🧪 Daydream stub listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Daydream API stub")
+    parser.add_argument("--port", type=int, default=STUB_PORT)
+    parser.add_argument("--latency", type=float, default=STUB_LATENCY)
+    parser.add_argument("--encode-cost", type=float, default=STUB_ENCODE_COST,
+                        help="extra seconds per prompt field in a PATCH")
+    args = parser.parse_args()
+
+    stub = DaydreamStub(args.port, args.latency, args.encode_cost).start()
+    print(f"Set DAYDREAM_API_URL={stub.url} to point the scripts at it. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
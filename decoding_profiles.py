@@ -0,0 +1,68 @@
+import numpy as np
+
+# Configuration
+SAMPLE_RATE = 16000
+LANGUAGE = "en"
+ADAPTIVE_LOGPROB = -0.8  # Segments decoded greedily below this avg log-prob get a beam re-decode
+ADAPTIVE_BEAM_SIZE = 5
+SEGMENT_PAD = 0.2  # Seconds of context kept around an ambiguous segment when re-decoding
+
+# Live decoding settings, cheapest first
+GREEDY = {
+    "beam_size": 1,
+    "best_of": 1,
+    "temperature": 0.0,
+    "condition_on_previous_text": False,
+    "without_timestamps": True,
+}
+
+DECODING_PROFILES = {
+    # Original behaviour: full beam search, auto language, timestamps
+    "accurate": {"beam_size": 5},
+    # Greedy, no timestamp tokens, no previous-text conditioning
+    "greedy": dict(GREEDY),
+    # Greedy, fixed language (skips detection), prompt seeded with the mood vocabulary
+    "keyword": dict(GREEDY, language=LANGUAGE, vocabulary_prompt=True),
+    # "keyword", plus a beam re-decode of low-confidence segments only
+    "adaptive": dict(GREEDY, language=LANGUAGE, vocabulary_prompt=True, adaptive=True,
+                     without_timestamps=False),
+}
+
+def build_initial_prompt(mood_keywords):
+    """Prompt that biases Whisper towards the words we're spotting"""
+    words = []
+    for keywords in mood_keywords.values():
+        for keyword in keywords:
+            if keyword not in words:
+                words.append(keyword)
+    return "Football fan reactions: " + ", ".join(words) + "."
+
+def whisper_options(profile, mood_keywords=None):
+    """Turn a profile name into model.transcribe keyword arguments"""
+    options = dict(DECODING_PROFILES[profile])
+    options.pop("adaptive", None)
+    if options.pop("vocabulary_prompt", False) and mood_keywords:
+        options["initial_prompt"] = build_initial_prompt(mood_keywords)
+    return options
+
+def transcribe_with_profile(model, audio, profile="accurate", mood_keywords=None):
+    """Transcribe a float32 16 kHz buffer with a decoding profile; returns lower-case text"""
+    options = whisper_options(profile, mood_keywords)
+    segments, info = model.transcribe(audio, **options)
+    segments = list(segments)
+
+    if DECODING_PROFILES[profile].get("adaptive"):
+        beam_options = dict(options, beam_size=ADAPTIVE_BEAM_SIZE, without_timestamps=True)
+        texts = []
+        for segment in segments:
+            text = segment.text
+            if segment.avg_logprob < ADAPTIVE_LOGPROB:
+                start = max(0, int((segment.start - SEGMENT_PAD) * SAMPLE_RATE))
+                end = min(len(audio), int((segment.end + SEGMENT_PAD) * SAMPLE_RATE))
+                redo, _ = model.transcribe(np.ascontiguousarray(audio[start:end]), **beam_options)
+                text = " ".join(s.text for s in redo) or text
+            texts.append(text)
+    else:
+        texts = [segment.text for segment in segments]
+
+    return " ".join(t.strip().lower() for t in texts if t.strip())
@@ -1,10 +1,14 @@
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
-import requests
 import json
 import time
-from faster_whisper import WhisperModel
+from whisper_registry import get_model
+from audio_ingest import transcribe_stream
+from transcript_cache import TranscriptCache
+from mood_schedule import compress_timeline, MoodSchedulePlayer
+from mood_matcher import MoodMatcher
+from daydream_client import DaydreamClient, UNCHANGED
 import subprocess
 
 # Configuration
@@ -15,6 +19,7 @@ if not os.path.exists(VIDEO_PATH):
     print(f"Current directory: {os.getcwd()}")
     print(f"Files in input_vids: {os.listdir('input_vids')}")
 WHISPER_MODEL = "base"
+BEAM_SIZE = 5
 
 # Mood-based visual styles
 MOOD_STYLES = {
@@ -45,21 +50,26 @@ MOOD_KEYWORDS = {
     "boring": ["slow", "uneventful", "nothing", "quiet", "waiting", "stalled"]
 }
 
+# Compiled once at startup; word-boundary and phrase aware
+MOOD_MATCHER = MoodMatcher(MOOD_KEYWORDS)
+
+# Re-runs after keyword/style tweaks skip Whisper entirely
+TRANSCRIPT_CACHE = TranscriptCache()
+
+# Shared keep-alive session for every Daydream call
+DAYDREAM = DaydreamClient(DAYDREAM_API_KEY)
+
 def transcribe_audio(video_path):  # Change parameter name
-    """Transcribe audio using faster-whisper"""
-    print("Loading Whisper model...")
-    model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
-    
-    print("Transcribing audio...")
-    segments, info = model.transcribe(video_path, beam_size=5)  # Pass video directly
-    
-    transcriptions = []
-    for segment in segments:
-        transcriptions.append({
-            'start': segment.start,
-            'end': segment.end,
-            'text': segment.text.lower()
-        })
+    """Transcribe audio using faster-whisper (cached by file content + settings)"""
+    def run_whisper(path):
+        model = get_model(WHISPER_MODEL)  # Shared, loaded and warmed once per process
+        print("Transcribing audio...")
+        return list(transcribe_stream(model, path, beam_size=BEAM_SIZE))  # PCM piped from ffmpeg
+    
+    settings = {"model": WHISPER_MODEL, "beam_size": BEAM_SIZE, "language": None}
+    transcriptions = TRANSCRIPT_CACHE.transcribe(video_path, settings, run_whisper)
+    for segment in transcriptions:
+        segment['text'] = segment['text'].lower()
     
     return transcriptions
 
@@ -74,13 +84,8 @@ def detect_mood(transcriptions):
     
     for trans in transcriptions:
         text = trans['text']
-        detected_mood = "boring"  # default
-        
-        # Check for mood keywords
-        for mood, keywords in MOOD_KEYWORDS.items():
-            if any(keyword in text for keyword in keywords):
-                detected_mood = mood
-                break
+        # Check for mood keywords, "boring" by default
+        detected_mood = MOOD_MATCHER.best_mood(text) or "boring"
         
         mood_timeline.append({
             'start': trans['start'],
@@ -95,15 +100,10 @@ def detect_mood(transcriptions):
 
 def create_daydream_stream(pipeline_id="pip_SD-turbo"):
     """Create a Daydream stream"""
-    url = "https://api.daydream.live/v1/streams"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {DAYDREAM_API_KEY}"
-    }
-    data = {"pipeline_id": pipeline_id}
-    
     print("Creating Daydream stream...")
-    response = requests.post(url, headers=headers, json=data)
+    response = DAYDREAM.create_stream(pipeline_id)
+    if response is None:
+        return None
     
     if response.status_code == 200 or response.status_code == 201:
         result = response.json()
@@ -119,17 +119,14 @@ def create_daydream_stream(pipeline_id="pip_SD-turbo"):
 
 def update_stream_mood(stream_id, mood):
     """Update Daydream stream with mood-based parameters"""
-    url = f"https://api.daydream.live/v1/streams/{stream_id}"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {DAYDREAM_API_KEY}"
-    }
-    
     style = MOOD_STYLES[mood]
-    data = {"params": style}
     
     print(f"\nUpdating to {mood.upper()} mood...")
-    response = requests.patch(url, headers=headers, json=data)
+    response = DAYDREAM.update_stream(stream_id, style, label=mood)
+    if response is None:
+        return False
+    if response is UNCHANGED:
+        return True  # The stream already has this style
     
     if response.status_code == 200:
         print(f"✓ Stream updated to {mood} style")
@@ -189,18 +186,11 @@ def main():
     print("Waiting 5 seconds for stream to stabilize...")
     time.sleep(5)
     
-    current_mood = None
-    for entry in mood_timeline:
-        if entry['mood'] != current_mood:
-            update_stream_mood(stream_id, entry['mood'])
-            current_mood = entry['mood']
-            
-            # Wait until next mood change
-            if mood_timeline.index(entry) < len(mood_timeline) - 1:
-                next_entry = mood_timeline[mood_timeline.index(entry) + 1]
-                wait_time = next_entry['start'] - entry['start']
-                print(f"Waiting {wait_time:.1f}s until next mood change...")
-                time.sleep(wait_time)
+    # Fire each change at its absolute offset from one monotonic anchor, early by the measured PATCH latency
+    changes = compress_timeline(mood_timeline)
+    print(f"{len(changes)} mood changes scheduled")
+    player = MoodSchedulePlayer(lambda mood: update_stream_mood(stream_id, mood))
+    player.play(changes)
     
     print("\n✓ All mood changes applied!")
     print(f"Stream ID: {stream_id}")
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+from decoding_profiles import whisper_options, transcribe_with_profile
+from live_pipeline import StageStats
+
+# Configuration
+MAX_BATCH = 8  # Chunks encoded together
+MAX_WAIT = 0.05  # Seconds to wait for a batch to fill after the first request arrives
+NO_SPEECH_THRESHOLD = 0.6  # Same silence rule as faster-whisper's transcribe()
+LOGPROB_THRESHOLD = -1.0
+
+class InferenceScheduler:
+    """
+    One shared Whisper model serving many producers. Requests arriving within MAX_WAIT of
+    each other are encoded as one batch and decoded with one generate() call; results are
+    routed back through futures.
+    """
+
+    def __init__(self, model, profile="keyword", mood_keywords=None, max_batch=MAX_BATCH,
+                 max_wait=MAX_WAIT):
+        self.model = model
+        self.profile = profile
+        self.mood_keywords = mood_keywords
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.options = whisper_options(profile, mood_keywords)
+        self.batched = self._setup_batching()
+
+        self.requests = queue.Queue()
+        self.queue_delay = StageStats()
+        self.batch_time = StageStats()
+        self.batch_sizes = deque(maxlen=1000)  # Recent batches, for the mean fill
+        self.batches = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._worker, name="inference", daemon=True)
+        self.thread.start()
+
+    def _setup_batching(self):
+        """Batched decoding needs a fixed language and no per-segment fallback; else go sequential"""
+        language = self.options.get("language")
+        if self.max_batch <= 1 or not language or self.options.get("temperature", 0.0) != 0.0:
+            return False
+        try:
+            from faster_whisper.tokenizer import Tokenizer
+            from faster_whisper.transcribe import get_suppressed_tokens
+        except ImportError:
+            return False
+
+        model = self.model
+        self.tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual,
+                                   task="transcribe", language=language)
+        prompt = []
+        initial_prompt = self.options.get("initial_prompt")
+        if initial_prompt:
+            prompt.append(self.tokenizer.sot_prev)
+            prompt.extend(self.tokenizer.encode(" " + initial_prompt.strip())[-(model.max_length // 2 - 1):])
+        prompt.extend(self.tokenizer.sot_sequence)
+        prompt.append(self.tokenizer.no_timestamps)
+        self.prompt = prompt
+        self.suppress_tokens = get_suppressed_tokens(self.tokenizer, [-1])
+        return True
+
+    def submit(self, audio):
+        """Queue a float32 16 kHz buffer (<= 30s); returns a Future resolving to lower-case text"""
+        future = Future()
+        self.requests.put((time.monotonic(), np.ascontiguousarray(audio, dtype=np.float32), future))
+        return future
+
+    def _collect(self):
+        """Block for one request, then gather more until the batch is full or max_wait passes"""
+        try:
+            batch = [self.requests.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [item for item in batch if item[2].set_running_or_notify_cancel()]
+
+    def _features(self, audio):
+        extractor = self.model.feature_extractor
+        audio = audio[:extractor.n_samples]
+        features = extractor(audio)[:, :extractor.nb_max_frames]
+        if features.shape[1] < extractor.nb_max_frames:
+            features = np.pad(features, ((0, 0), (0, extractor.nb_max_frames - features.shape[1])))
+        return features
+
+    def _transcribe_batch(self, audios):
+        """One encoder pass and one generate() call for the whole batch"""
+        features = np.stack([self._features(audio) for audio in audios]).astype(np.float32)
+        encoder_output = self.model.encode(features)
+        results = self.model.model.generate(
+            encoder_output,
+            [self.prompt] * len(audios),
+            beam_size=self.options.get("beam_size", 1),
+            max_length=self.model.max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=True,
+            suppress_tokens=self.suppress_tokens,
+        )
+
+        texts = []
+        for result in results:
+            tokens = [t for t in result.sequences_ids[0] if t < self.tokenizer.eot]
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOGPROB_THRESHOLD:
+                texts.append("")
+            else:
+                texts.append(self.tokenizer.decode(tokens).strip().lower())
+        return texts
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            start = time.monotonic()
+            for submitted_at, audio, future in batch:
+                self.queue_delay.record(start - submitted_at)
+            self.batch_sizes.append(len(batch))
+            self.batches += 1
+
+            audios = [audio for _, audio, _ in batch]
+            try:
+                if self.batched and len(batch) > 1:
+                    texts = self._transcribe_batch(audios)
+                else:
+                    texts = [transcribe_with_profile(self.model, audio, self.profile, self.mood_keywords)
+                             for audio in audios]
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, _, future), text in zip(batch, texts):
+                    future.set_result(text)
+            self.batch_time.record(time.monotonic() - start)
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=2)
+
+    def print_stats(self):
+        q = self.queue_delay.summary()
+        b = self.batch_time.summary()
+        sizes = list(self.batch_sizes)
+        mean_size = sum(sizes) / len(sizes) if sizes else 0.0
+        print(f"🧠 Inference: {self.batches} batches ({'batched' if self.batched else 'sequential'}), "
+              f"mean size {mean_size:.1f}/{self.max_batch} ({mean_size / self.max_batch:.0%} fill), "
+              f"queue p50={q['p50'] * 1000:.0f}ms p95={q['p95'] * 1000:.0f}ms, "
+              f"batch p50={b['p50'] * 1000:.0f}ms p95={b['p95'] * 1000:.0f}ms, backlog={self.requests.qsize()}")
@@ -0,0 +1,82 @@
+import numpy as np
+import metrics
+from decoding_profiles import whisper_options, transcribe_with_profile
+from mood_matcher import MoodMatcher
+from streaming_transcribe import is_speech
+
+# Configuration
+SPOTTER_MODEL = "tiny"  # Cheap first-stage model
+SPOTTER_PROFILE = "keyword"  # Greedy + vocabulary prompt
+ESCALATE_LOGPROB = -1.0  # Spotter output below this avg log-prob is too unsure to trust
+NEAR_MISS_MAX_EDITS = 1  # Words this close to a keyword (and >= 4 letters) also escalate
+
+def _edit_distance_at_most(a, b, limit):
+    """True if Levenshtein(a, b) <= limit (small limits only)"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+class KeywordSpotter:
+    """VAD → tiny Whisper pass → full model only for chunks that might hold a mood cue"""
+
+    def __init__(self, spotter_model, full_model, mood_keywords, sample_rate=16000,
+                 full_profile="keyword"):
+        self.spotter_model = spotter_model
+        self.full_model = full_model
+        self.mood_keywords = mood_keywords
+        self.matcher = MoodMatcher(mood_keywords)
+        self.sample_rate = sample_rate
+        self.full_profile = full_profile
+        self.spotter_options = whisper_options(SPOTTER_PROFILE, mood_keywords)
+        self.keyword_words = sorted({w for kws in mood_keywords.values() for kw in kws
+                                     for w in kw.split() if len(w) >= 4})
+        self.counts = {"chunks": 0, "silent": 0, "spotter_only": 0, "escalated": 0}
+
+    def _near_miss(self, text):
+        for word in text.split():
+            word = word.strip(".,!?'\"")
+            if len(word) >= 4 and any(_edit_distance_at_most(word, kw, NEAR_MISS_MAX_EDITS)
+                                      for kw in self.keyword_words):
+                return True
+        return False
+
+    def needs_full_pass(self, text, min_logprob):
+        """Escalate on any keyword, a near-miss spelling, or a low-confidence spotter result"""
+        return (bool(self.matcher.find(text)) or min_logprob < ESCALATE_LOGPROB
+                or self._near_miss(text))
+
+    def transcribe(self, audio_data):
+        """Same contract as transcribe_chunk: lower-case text, "" for silence"""
+        audio = np.ascontiguousarray(audio_data, dtype=np.float32).reshape(-1)
+        self.counts["chunks"] += 1
+
+        if not is_speech(audio, self.sample_rate):
+            self.counts["silent"] += 1
+            return ""
+
+        with metrics.span("whisper_spotter"):
+            segments, info = self.spotter_model.transcribe(audio, **self.spotter_options)
+            segments = list(segments)  # Segments are lazy; decode inside the span
+        text = " ".join(s.text.strip().lower() for s in segments if s.text.strip())
+        min_logprob = min((s.avg_logprob for s in segments), default=0.0)
+
+        if not text or not self.needs_full_pass(text, min_logprob):
+            self.counts["spotter_only"] += 1
+            return text
+
+        self.counts["escalated"] += 1
+        with metrics.span("whisper"):
+            return transcribe_with_profile(self.full_model, audio, self.full_profile, self.mood_keywords)
+
+    def print_stats(self):
+        c = self.counts
+        print(f"🔎 Keyword spotter: {c['chunks']} chunks, {c['silent']} silent, "
+              f"{c['spotter_only']} spotter-only, {c['escalated']} escalated to full model")
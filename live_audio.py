@@ -0,0 +1,226 @@
+import threading
+from collections import deque
+from time import monotonic
+import numpy as np
+import metrics
+from decoding_profiles import transcribe_with_profile
+
+# Configuration
+SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono
+BLOCK_DURATION = 0.05  # Seconds per PortAudio callback block (smaller = lower capture latency)
+BUFFER_SECONDS = 30  # Ring buffer capacity
+WAIT_TIMEOUT = 1.0  # Seconds a reader waits for new audio before giving up (returns None)
+GAP_TOLERANCE = 0.5  # ADC timestamps more than this many blocks apart from the sample count = gap
+
+class AudioRecorder:
+    """
+    Microphone capture into a preallocated ring. The PortAudio callback is the only writer and
+    takes no lock; readers notice overruns themselves. Every sample is either delivered,
+    counted as dropped (reader too slow) or counted as a gap (lost before the callback, zero-filled
+    so positions stay aligned with the ADC clock).
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, block_duration=BLOCK_DURATION,
+                 buffer_seconds=BUFFER_SECONDS):
+        self.sample_rate = sample_rate
+        self.blocksize = int(sample_rate * block_duration)
+        self.capacity = int(sample_rate * buffer_seconds)
+        # Preallocated float32 ring; positions are absolute sample counts
+        self.ring = np.zeros(self.capacity, dtype=np.float32)
+        self.write_pos = 0  # Advanced by the writer only after the samples are in place
+        self.read_pos = 0  # Owned by the reader
+        self.dropped_samples = 0  # Overwritten before the reader got to them
+        self.gap_samples = 0  # Never delivered by PortAudio (zero-filled)
+        self.overflows = 0  # Callbacks flagged with input_overflow
+        self.status_flags = 0  # Callbacks with any status flag set
+        self.gaps = deque(maxlen=100)  # (sample position, samples missing)
+        self.anchor = None  # (sample position, monotonic ADC time) of the latest block
+        self.data_ready = threading.Event()
+        self.is_recording = False
+
+    def callback(self, indata, frames, time, status):
+        """PortAudio callback: copy into the ring and publish; no locks, no buffer allocation"""
+        # Plain int counters only: metrics.count() takes a lock the exporter holds while sorting
+        if status:
+            self.status_flags += 1
+            if status.input_overflow:
+                self.overflows += 1
+
+        adc_time = time.inputBufferAdcTime
+        if adc_time:
+            adc_time += monotonic() - time.currentTime  # Stream clock → monotonic
+            if self.anchor is not None:
+                pos, anchor_time = self.anchor
+                missing = int(round((adc_time - anchor_time) * self.sample_rate)) - (self.write_pos - pos)
+                if missing > self.blocksize * GAP_TOLERANCE:
+                    self._gap(missing)
+            self.anchor = (self.write_pos, adc_time)
+
+        self._write(indata[:, 0])
+        self.data_ready.set()
+
+    def _gap(self, n):
+        """Zero-fill n samples PortAudio never delivered"""
+        self.gaps.append((self.write_pos, n))
+        self.gap_samples += n
+        skip = max(0, n - self.capacity)
+        self.write_pos += skip
+        self._write(np.zeros(n - skip, dtype=np.float32))
+
+    def _write(self, samples):
+        """Copy samples into the ring, then publish them by advancing write_pos"""
+        n = len(samples)
+        if n > self.capacity:
+            self.write_pos += n - self.capacity  # Lost to the reader; it counts them as dropped
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.ring[start:start + first] = samples[:first]
+        self.ring[:n - first] = samples[first:]
+        self.write_pos += n
+
+    def _drop(self, n):
+        self.dropped_samples += n
+        metrics.count("dropped_samples", n)
+        print(f"⚠️  Audio buffer overrun, dropped {n} samples")
+
+    def _skip_overrun(self):
+        """Move the reader past audio the writer has already overwritten"""
+        lost = self.write_pos - self.capacity - self.read_pos
+        if lost > 0:
+            self.read_pos += lost
+            self._drop(lost)
+
+    def _copy(self, start, n):
+        """Copy n samples from absolute position start"""
+        out = np.empty(n, dtype=np.float32)
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        out[:first] = self.ring[offset:offset + first]
+        out[first:] = self.ring[:n - first]
+        # The writer lapped us mid-copy: the head of `out` is newer audio, so don't deliver it
+        lapped = min(n, self.write_pos - self.capacity - start)
+        if lapped > 0:
+            out[:lapped] = 0.0
+            self._drop(lapped)
+        return out
+
+    def _read(self, n):
+        """Copy the next n unread samples out of the ring"""
+        out = self._copy(self.read_pos, n)
+        self.read_pos += n
+        return out
+
+    def _wait_for(self, n):
+        """Block until n unread samples exist; False if recording stops or no audio arrives in time"""
+        while True:
+            self._skip_overrun()
+            if self.write_pos - self.read_pos >= n:
+                return True
+            if not self.is_recording:
+                return False
+            self.data_ready.clear()
+            if self.write_pos - self.read_pos >= n:
+                return True
+            before = self.write_pos
+            self.data_ready.wait(WAIT_TIMEOUT)
+            if self.write_pos == before:
+                metrics.count("capture_timeouts")
+                return False
+
+    def time_of(self, pos):
+        """Monotonic capture time of absolute sample position `pos`, from the ADC timestamps"""
+        if self.anchor is None:
+            return None
+        anchor_pos, anchor_time = self.anchor
+        return anchor_time + (pos - anchor_pos) / self.sample_rate
+
+    def capture_time(self):
+        """When the last sample handed to the reader was captured (now, if there are no ADC timestamps)"""
+        captured = self.time_of(self.read_pos)
+        return monotonic() if captured is None else captured
+
+    def _counters(self):
+        return {"input_status_flags": self.status_flags, "input_overflow": self.overflows,
+                "gap_samples": self.gap_samples}
+
+    def start_recording(self):
+        """Start recording from microphone"""
+        import sounddevice as sd  # Imported here so headless hosts (no PortAudio) can use the ring
+        self.is_recording = True
+        metrics.add_collector(self._counters)
+        self.stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='float32',
+            callback=self.callback,
+            blocksize=self.blocksize
+        )
+        self.stream.start()
+        print(f"🎤 Microphone recording started ({self.blocksize} sample blocks)")
+
+    def stop_recording(self):
+        """Stop recording"""
+        self.is_recording = False
+        if hasattr(self, 'stream'):
+            self.stream.stop()
+            self.stream.close()
+        self.data_ready.set()
+        print("🎤 Microphone recording stopped")
+
+    def get_audio_chunk(self, duration):
+        """
+        Get exactly `duration` seconds of float32 audio, or None if none is ready within
+        WAIT_TIMEOUT (partial audio stays buffered). After stop, the remaining tail is returned.
+        """
+        wanted = int(round(self.sample_rate * duration))
+        if self._wait_for(wanted):
+            return self._read(wanted)
+        if not self.is_recording:
+            remaining = self.write_pos - self.read_pos
+            if remaining > 0:
+                return self._read(min(remaining, wanted))
+        return None
+
+    def get_window(self, window, hop):
+        """Wait for `hop` seconds of new audio, then return (end_sample, last `window` seconds)"""
+        hop_samples = int(round(self.sample_rate * hop))
+        window_samples = min(int(round(self.sample_rate * window)), self.capacity)
+
+        if not self._wait_for(hop_samples):
+            return None
+
+        # Consume whole hops only, so windows stay on a fixed grid
+        hops = (self.write_pos - self.read_pos) // hop_samples
+        self.read_pos += hops * hop_samples
+        end = self.read_pos
+        start = max(0, end - window_samples, self.write_pos - self.capacity)
+        return end, self._copy(start, end - start)
+
+    def print_stats(self):
+        captured = self.write_pos / self.sample_rate
+        print(f"🎤 Capture: {captured:.0f}s, {self.dropped_samples} samples dropped (reader behind), "
+              f"{self.gap_samples} missing in {len(self.gaps)} gaps, {self.overflows} input overflows")
+
+class PushRecorder(AudioRecorder):
+    """AudioRecorder fed by push() instead of a microphone (files, network ingest, replays)"""
+
+    def push(self, samples):
+        """Append float32 mono samples to the ring (one pushing thread per recorder)"""
+        self._write(np.asarray(samples, dtype=np.float32).reshape(-1))
+        self.data_ready.set()
+
+    def start_recording(self):
+        self.is_recording = True
+
+    def stop_recording(self):
+        self.is_recording = False
+        self.data_ready.set()
+
+def transcribe_chunk(audio_data, model, profile="accurate", mood_keywords=None):
+    """Transcribe a float32 16 kHz audio buffer directly (no temp WAV) with a decoding profile"""
+    audio = np.ascontiguousarray(audio_data, dtype=np.float32).reshape(-1)
+    with metrics.span("whisper"):
+        return transcribe_with_profile(model, audio, profile, mood_keywords)
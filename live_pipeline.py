@@ -0,0 +1,205 @@
+import queue
+import threading
+import time
+from collections import deque
+import metrics
+
+# Configuration
+AUDIO_QUEUE_SIZE = 2  # Chunks waiting for Whisper before the oldest is dropped
+TEXT_QUEUE_SIZE = 4  # Transcripts waiting for mood decision
+STATS_WINDOW = 200  # Samples kept per stage for percentiles
+
+def put_drop_oldest(q, item):
+    """Put item on a bounded queue, evicting the oldest entry if it is full. Returns drop count."""
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+class StageStats:
+    def __init__(self, window=STATS_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        """Record one duration in seconds"""
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        """Return count, p50, p95 and max over the recent window (seconds)"""
+        with self.lock:
+            ordered = sorted(self.samples)
+            count = self.count
+        if not ordered:
+            return {"count": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "count": count,
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+class LivePipeline:
+    """Capture → transcription → mood decision → actuators, each on its own thread"""
+
+    def __init__(self, capture, transcribe, detect_mood, actuators, on_idle=None, capture_time=time.monotonic):
+        self.capture = capture  # () -> audio item or None
+        self.capture_time = capture_time  # () -> when the audio just captured was recorded
+        self.transcribe = transcribe  # audio item -> text ("" = silence, None = nothing new)
+        self.detect_mood = detect_mood
+        self.on_idle = on_idle  # () -> mood, called when a step yields no text (lets moods time out)
+        self.actuators = actuators  # name -> callable(mood)
+
+        self.audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        self.text_queue = queue.Queue(maxsize=TEXT_QUEUE_SIZE)
+        # Only the latest mood matters to an actuator, so each holds one pending item
+        self.actuator_queues = {name: queue.Queue(maxsize=1) for name in actuators}
+
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self.dropped = {"audio": 0, "text": 0, "actuate": 0}
+        self.current_mood = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def _stat(self, name):
+        with self.stats_lock:
+            if name not in self.stats:
+                self.stats[name] = StageStats()
+            return self.stats[name]
+
+    def _record(self, name, seconds):
+        self._stat(name).record(seconds)
+        metrics.observe(name, seconds)
+
+    def _get(self, q):
+        """Blocking get that wakes up periodically to check for shutdown"""
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return None
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            start = time.monotonic()
+            audio_item = self.capture()
+            read_at = time.monotonic()
+            if audio_item is None:
+                continue
+            captured_at = self.capture_time()  # Earlier than read_at when audio sat in the ring
+            self._record("capture", read_at - start)
+            dropped = put_drop_oldest(self.audio_queue, (captured_at, audio_item))
+            if dropped:
+                self.dropped["audio"] += dropped
+                metrics.count("dropped_audio_chunks", dropped)
+            metrics.gauge("audio_queue_depth", self.audio_queue.qsize())
+
+    def _transcribe_loop(self):
+        while True:
+            item = self._get(self.audio_queue)
+            if item is None:
+                return
+            captured_at, audio_item = item
+            start = time.monotonic()
+            self._record("queue_wait", start - captured_at)
+            text = self.transcribe(audio_item)
+            self._record("transcribe", time.monotonic() - start)
+            dropped = put_drop_oldest(self.text_queue, (captured_at, text))
+            if dropped:
+                self.dropped["text"] += dropped
+                metrics.count("dropped_transcripts", dropped)
+            metrics.gauge("text_queue_depth", self.text_queue.qsize())
+
+    def _decide_loop(self):
+        while True:
+            item = self._get(self.text_queue)
+            if item is None:
+                return
+            captured_at, text = item
+            if not text:
+                if text is not None:  # None just means nothing newly stable yet
+                    print("🔇 No speech detected")
+                if self.on_idle:
+                    self._set_mood(self.on_idle(), captured_at)
+                continue
+
+            print(f"💬 You said: '{text}'")
+            start = time.monotonic()
+            new_mood = self.detect_mood(text)
+            self._record("detect", time.monotonic() - start)
+            self._set_mood(new_mood, captured_at)
+
+    def _set_mood(self, new_mood, captured_at):
+        if new_mood != self.current_mood:
+            print(f"\n🎨 Mood change: {self.current_mood} → {new_mood}\n")
+            self.current_mood = new_mood
+            for q in self.actuator_queues.values():
+                self.dropped["actuate"] += put_drop_oldest(q, (captured_at, new_mood))
+
+    def _actuate_loop(self, name):
+        action = self.actuators[name]
+        q = self.actuator_queues[name]
+        while True:
+            item = self._get(q)
+            if item is None:
+                return
+            captured_at, mood = item
+            start = time.monotonic()
+            try:
+                action(mood)
+            except Exception as e:
+                print(f"❌ {name} update failed: {e}")
+            done = time.monotonic()
+            self._record(f"actuate:{name}", done - start)
+            self._record(f"end_to_end:{name}", done - captured_at)
+
+    def apply_mood(self, mood):
+        """Synchronously apply a mood on every actuator (used for the initial state)"""
+        for name, action in self.actuators.items():
+            action(mood)
+        self.current_mood = mood
+
+    def start(self):
+        """Start all pipeline threads"""
+        self.stop_event.clear()
+        targets = [
+            ("capture", self._capture_loop, ()),
+            ("transcribe", self._transcribe_loop, ()),
+            ("decide", self._decide_loop, ()),
+        ] + [(f"actuate:{name}", self._actuate_loop, (name,)) for name in self.actuators]
+
+        for name, target, args in targets:
+            thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=2):
+        """Signal all threads to stop and wait briefly for them"""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+
+    def print_stats(self):
+        """Print per-stage timing and queue health"""
+        print("📊 Pipeline stats (ms):")
+        with self.stats_lock:
+            names = sorted(self.stats)
+        for name in names:
+            s = self.stats[name].summary()
+            print(f"   {name:<22} n={s['count']:<5} p50={s['p50'] * 1000:7.1f} "
+                  f"p95={s['p95'] * 1000:7.1f} max={s['max'] * 1000:7.1f}")
+        print(f"   queues: audio={self.audio_queue.qsize()} text={self.text_queue.qsize()} "
+              f"dropped={self.dropped}")
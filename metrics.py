@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Configuration
+METRICS_EXPORT = os.getenv("LIVE_METRICS")  # Unset = off; "jsonl:<path>" or "prom:<path>"
+EXPORT_INTERVAL = 10.0  # Seconds between exports
+QUANTILE_WINDOW = 500  # Recent samples kept per stage for quantiles
+
+# Process-wide registry; everything below is a no-op until start_exporter() turns it on
+_enabled = False
+_lock = threading.Lock()
+_spans = {}  # stage -> [count, total seconds, recent samples]
+_counters = {}
+_gauges = {}
+_collectors = []  # () -> {counter: value}, read at export time (for code that must not take _lock)
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(stage):
+    """Time a with-block under `stage`; a shared do-nothing object when metrics are off"""
+    return _Span(stage) if _enabled else _NULL_SPAN
+
+def observe(stage, seconds):
+    """Record one duration for `stage`"""
+    if not _enabled:
+        return
+    with _lock:
+        entry = _spans.get(stage)
+        if entry is None:
+            entry = _spans[stage] = [0, 0.0, deque(maxlen=QUANTILE_WINDOW)]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2].append(seconds)
+
+def count(event, n=1):
+    """Add n to a monotonically increasing counter"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + n
+
+def gauge(name, value):
+    """Set a point-in-time value (queue depth, backlog)"""
+    if not _enabled:
+        return
+    _gauges[name] = value
+
+def add_collector(collect):
+    """Register a callable whose {counter: value} dict is merged into every snapshot"""
+    _collectors.append(collect)
+
+def snapshot():
+    """Current values as a plain dict"""
+    with _lock:
+        spans = {stage: (c, total, sorted(recent)) for stage, (c, total, recent) in _spans.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+    for collect in _collectors:
+        counters.update(collect())
+    summaries = {}
+    for stage, (c, total, ordered) in spans.items():
+        summaries[stage] = {
+            "count": c,
+            "sum": total,
+            "p50": ordered[len(ordered) // 2] if ordered else 0.0,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+            "max": ordered[-1] if ordered else 0.0,
+        }
+    return {"time": time.time(), "spans": summaries, "counters": counters, "gauges": gauges}
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def to_prometheus(snap):
+    """Prometheus text exposition format (for the node_exporter textfile collector or a scrape proxy)"""
+    lines = ["# HELP live_stage_seconds Hot-path stage timings", "# TYPE live_stage_seconds summary"]
+    for stage, s in sorted(snap["spans"].items()):
+        label = _label(stage)
+        lines.append(f'live_stage_seconds{{stage="{label}",quantile="0.5"}} {s["p50"]:.6f}')
+        lines.append(f'live_stage_seconds{{stage="{label}",quantile="0.95"}} {s["p95"]:.6f}')
+        lines.append(f'live_stage_seconds_sum{{stage="{label}"}} {s["sum"]:.6f}')
+        lines.append(f'live_stage_seconds_count{{stage="{label}"}} {s["count"]}')
+    lines += ["# HELP live_events_total Hot-path event counters", "# TYPE live_events_total counter"]
+    for event, n in sorted(snap["counters"].items()):
+        lines.append(f'live_events_total{{event="{_label(event)}"}} {n}')
+    lines += ["# HELP live_gauge Point-in-time values", "# TYPE live_gauge gauge"]
+    for name, value in sorted(snap["gauges"].items()):
+        lines.append(f'live_gauge{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Writes a snapshot every `interval` seconds: appended JSON lines, or an atomically replaced .prom file"""
+
+    def __init__(self, fmt, path, interval=EXPORT_INTERVAL):
+        self.fmt = fmt
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name="metrics-export", daemon=True)
+
+    def export(self):
+        snap = snapshot()
+        if self.fmt == "jsonl":
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(snap) + "\n")
+        else:
+            from obs_overlay import write_atomic
+            write_atomic(self.path, to_prometheus(snap).encode())
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.export()
+            except OSError as e:
+                print(f"⚠️  Metrics export failed: {e}")
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Write a final snapshot and stop"""
+        self.stop_event.set()
+        self.thread.join(timeout=2)
+        self.export()
+
+def start_exporter(spec=METRICS_EXPORT, interval=EXPORT_INTERVAL):
+    """Turn metrics on and export them periodically; returns None (and stays off) if spec is empty"""
+    global _enabled
+    if not spec:
+        return None
+    fmt, _, path = spec.partition(":")
+    if fmt not in ("jsonl", "prom") or not path:
+        print(f"⚠️  Ignoring LIVE_METRICS='{spec}' (expected jsonl:<path> or prom:<path>)")
+        return None
+    _enabled = True
+    print(f"📈 Exporting metrics as {fmt} to {path} every {interval:g}s")
+    return MetricsExporter(fmt, path, interval).start()
@@ -0,0 +1,121 @@
+import threading
+import time
+from live_pipeline import StageStats
+
+# Configuration
+RETRY_DELAY = 1.0  # Seconds before re-sending after a failed update
+
+class _StreamState:
+    def __init__(self):
+        self.desired = None
+        self.desired_at = None
+        self.applied = None
+        self.in_flight = None
+        self.failures = 0
+        self.closed = False
+        self.wake = threading.Condition()
+        self.thread = None
+
+class MoodDispatcher:
+    """Non-blocking, last-writer-wins mood updates with at most one in-flight PATCH per stream"""
+
+    def __init__(self, send):
+        self.send = send  # (stream_id, mood) -> bool
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.stopping = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.apply_latency = StageStats()
+
+    def _state(self, stream_id):
+        with self.lock:
+            state = self.streams.get(stream_id)
+            if state is None:
+                state = self.streams[stream_id] = _StreamState()
+                state.thread = threading.Thread(
+                    target=self._worker, args=(stream_id, state),
+                    name=f"dispatch:{stream_id}", daemon=True
+                )
+                state.thread.start()
+            return state
+
+    def submit(self, stream_id, mood):
+        """Request a mood; returns immediately. Replaces any not-yet-sent request"""
+        state = self._state(stream_id)
+        with state.wake:
+            self.submitted += 1
+            if state.desired is not None and state.desired != state.applied and state.desired != state.in_flight:
+                self.coalesced += 1  # Previous target was never sent
+            state.desired = mood
+            state.desired_at = time.monotonic()
+            state.wake.notify()
+
+    def applied(self, stream_id):
+        """Last mood the API confirmed for this stream"""
+        state = self.streams.get(stream_id)
+        return state.applied if state else None
+
+    def _worker(self, stream_id, state):
+        while True:
+            with state.wake:
+                while not (self.stopping or state.closed) and (state.desired is None
+                                                               or state.desired == state.applied):
+                    state.wake.wait()
+                if self.stopping or state.closed:
+                    return
+                mood, requested_at = state.desired, state.desired_at
+                state.in_flight = mood
+
+            ok = False
+            try:
+                ok = self.send(stream_id, mood)
+            except Exception as e:
+                print(f"❌ Mood update for {stream_id} failed: {e}")
+            self.sent += 1
+
+            with state.wake:
+                state.in_flight = None
+                if ok:
+                    state.applied = mood
+                    state.failures = 0
+                    self.apply_latency.record(time.monotonic() - requested_at)
+                else:
+                    state.failures += 1
+            if not ok:
+                time.sleep(min(RETRY_DELAY * state.failures, 10))
+
+    def flush(self, timeout=5):
+        """Wait until every stream has applied its latest desired mood (or timeout)"""
+        deadline = time.monotonic() + timeout
+        for state in list(self.streams.values()):
+            while time.monotonic() < deadline:
+                with state.wake:
+                    if state.desired == state.applied:
+                        break
+                time.sleep(0.05)
+
+    def close(self, stream_id):
+        """Stop the worker for a stream that has ended (an unsent update is dropped)"""
+        with self.lock:
+            state = self.streams.pop(stream_id, None)
+        if state is None:
+            return
+        with state.wake:
+            state.closed = True
+            state.wake.notify()
+
+    def stop(self):
+        """Stop worker threads (pending, unsent updates are dropped)"""
+        self.stopping = True
+        for state in list(self.streams.values()):
+            with state.wake:
+                state.wake.notify()
+        for state in list(self.streams.values()):
+            state.thread.join(timeout=1)
+
+    def print_stats(self):
+        s = self.apply_latency.summary()
+        print(f"📨 Mood updates: submitted={self.submitted} sent={self.sent} coalesced={self.coalesced} "
+              f"apply p50={s['p50'] * 1000:.0f}ms p95={s['p95'] * 1000:.0f}ms")
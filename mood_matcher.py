@@ -0,0 +1,74 @@
+import re
+from collections import namedtuple
+
+TOKEN_RE = re.compile(r"[\w']+")
+
+# One keyword occurrence: character span in the original text
+Hit = namedtuple("Hit", ["mood", "keyword", "start", "end"])
+
+def _normalize(token):
+    return token.lower().replace("'", "")
+
+class MoodMatcher:
+    """Word-level trie over MOOD_KEYWORDS; matching is linear in the number of tokens"""
+
+    def __init__(self, mood_keywords):
+        self.root = {}
+        self.max_depth = 0
+        for mood, keywords in mood_keywords.items():
+            for keyword in keywords:
+                tokens = [_normalize(t) for t in TOKEN_RE.findall(keyword)]
+                if not tokens:
+                    continue
+                node = self.root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                # First mood to claim a phrase keeps it
+                node.setdefault(None, (mood, keyword))
+                self.max_depth = max(self.max_depth, len(tokens))
+
+    def find(self, text, context=""):
+        """
+        Return leftmost-longest, non-overlapping keyword hits in order. `context` is text heard just
+        before `text`: phrases may start in it, but only hits ending inside `text` are returned.
+        """
+        offset = len(context) + 1 if context else 0
+        if context:
+            text = context + " " + text
+        tokens = [(_normalize(m.group()), m.start() - offset, m.end() - offset)
+                  for m in TOKEN_RE.finditer(text)]
+        hits = []
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            best = None
+            for j in range(i, min(len(tokens), i + self.max_depth)):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                if None in node:
+                    best = (j, node[None])
+            if best:
+                j, (mood, keyword) = best
+                if tokens[j][2] > 0:
+                    hits.append(Hit(mood, keyword, tokens[i][1], tokens[j][2]))
+                i = j + 1
+            else:
+                i += 1
+        return hits
+
+    def counts(self, text, hits=None):
+        """Count hits per mood"""
+        counts = {}
+        for hit in hits if hits is not None else self.find(text):
+            counts[hit.mood] = counts.get(hit.mood, 0) + 1
+        return counts
+
+    def best_mood(self, text, context=""):
+        """Mood with the most hits; ties go to the most recent hit. None if no keywords"""
+        hits = self.find(text, context)
+        if not hits:
+            return None
+        counts = self.counts(text, hits)
+        last_seen = {hit.mood: hit.start for hit in hits}
+        return max(counts, key=lambda mood: (counts[mood], last_seen[mood]))
@@ -0,0 +1,243 @@
+import os
+import random
+import threading
+import time
+import numpy as np
+import metrics
+from audio_ingest import load_audio
+from live_pipeline import StageStats
+
+# Configuration
+MUSIC_SAMPLE_RATE = 44100
+MUSIC_CHANNELS = 2
+CROSSFADE = 1.5  # Seconds of overlap when the mood changes (0 = hard cut)
+MEMORY_BUDGET_MB = 256  # Decoded PCM kept in memory; tracks beyond this are decoded on demand
+BLOCK_SIZE = 1024  # Output frames per render call
+VOLUME = 0.5
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg')
+
+class _Voice:
+    """One looping track with a gain ramp"""
+
+    def __init__(self, audio, gain, target, ramp_samples):
+        self.audio = audio
+        self.pos = 0
+        self.gain = gain
+        self.fade_to(target, ramp_samples)
+
+    def fade_to(self, target, ramp_samples):
+        self.target = target
+        if ramp_samples <= 0:
+            self.gain = target
+            self.step = 0.0
+        else:
+            self.step = (target - self.gain) / ramp_samples
+
+    def finished(self):
+        return self.target == 0.0 and self.gain <= 0.0
+
+    def render(self, out):
+        frames = len(out)
+        gains = self.gain + self.step * np.arange(1, frames + 1, dtype=np.float32)
+        if self.step > 0:
+            np.minimum(gains, self.target, out=gains)
+        elif self.step < 0:
+            np.maximum(gains, self.target, out=gains)
+        self.gain = float(gains[-1])
+        if self.gain == self.target:
+            self.step = 0.0
+        gains = gains[:, None]
+
+        written = 0
+        while written < frames:
+            n = min(frames - written, len(self.audio) - self.pos)
+            out[written:written + n] += self.audio[self.pos:self.pos + n] * gains[written:written + n]
+            written += n
+            self.pos = (self.pos + n) % len(self.audio)
+
+class NullSink:
+    """Pulls audio at real-time pace and discards it; for headless runs and tests"""
+
+    def __init__(self, engine, blocksize=BLOCK_SIZE):
+        self.engine = engine
+        self.blocksize = blocksize
+        self.frames = 0
+        self.running = False
+
+    def _loop(self):
+        start = time.monotonic()
+        while self.running:
+            self.engine.render(self.blocksize)
+            self.frames += self.blocksize
+            ahead = start + self.frames / self.engine.sample_rate - time.monotonic()
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._loop, name="music-null-sink", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+class SoundDeviceSink:
+    """Default output device; the PortAudio callback mixes straight from memory"""
+
+    def __init__(self, engine, blocksize=BLOCK_SIZE):
+        import sounddevice as sd
+        self.stream = sd.OutputStream(samplerate=engine.sample_rate, channels=MUSIC_CHANNELS,
+                                      dtype='float32', blocksize=blocksize, callback=self._callback)
+        self.engine = engine
+
+    def _callback(self, outdata, frames, time, status):
+        outdata[:] = self.engine.render(frames)
+
+    def start(self):
+        self.stream.start()
+
+    def stop(self):
+        self.stream.stop()
+        self.stream.close()
+
+SINKS = {"sounddevice": SoundDeviceSink, "null": NullSink}
+
+class MoodMusicEngine:
+    """Pre-decoded mood music; switches happen off the caller's thread and crossfade with no gap"""
+
+    def __init__(self, audio_folder, moods, crossfade=CROSSFADE, memory_budget_mb=MEMORY_BUDGET_MB,
+                 sink="sounddevice", volume=VOLUME, sample_rate=MUSIC_SAMPLE_RATE):
+        self.audio_folder = audio_folder
+        self.crossfade = crossfade
+        self.volume = volume
+        self.sample_rate = sample_rate
+        self.files = self._find_files(moods)
+        self.tracks = self._preload(memory_budget_mb * 1024 * 1024)
+
+        self.voices = []
+        self.lock = threading.Lock()  # Guards voices between the switcher and the audio callback
+        self.current_mood = None
+        self.pending = None
+        self.changed = threading.Condition()
+        self.switch_latency = StageStats()  # play_mood() → new track fading in
+        self.switches = 0
+        self.running = True
+        threading.Thread(target=self._switcher, name="music-switch", daemon=True).start()
+
+        try:
+            self.sink = SINKS[sink](self)
+        except Exception as e:
+            print(f"⚠️  Audio output unavailable ({e}), music runs on a null sink")
+            self.sink = NullSink(self)
+        self.sink.start()
+
+    def _find_files(self, moods):
+        files = {}
+        if not os.path.exists(self.audio_folder):
+            print(f"⚠️  Audio folder '{self.audio_folder}' not found. Music disabled.")
+            return files
+        for mood in moods:
+            mood_dir = os.path.join(self.audio_folder, mood)
+            if os.path.isdir(mood_dir):
+                paths = sorted(os.path.join(mood_dir, f) for f in os.listdir(mood_dir)
+                               if f.endswith(AUDIO_EXTENSIONS))
+                if paths:
+                    files[mood] = paths
+        return files
+
+    def _decode(self, path):
+        try:
+            audio = load_audio(path, self.sample_rate, MUSIC_CHANNELS)
+        except (RuntimeError, OSError) as e:
+            print(f"❌ Error decoding {path}: {e}")
+            return None
+        return audio if len(audio) else None
+
+    def _preload(self, budget):
+        """Decode round-robin (every mood gets a track before any gets two) until the budget is spent"""
+        tracks = {mood: [] for mood in self.files}
+        used = 0
+        queues = {mood: list(paths) for mood, paths in self.files.items()}
+        while used < budget and any(queues.values()):
+            for mood, paths in queues.items():
+                if not paths or used >= budget:
+                    continue
+                audio = self._decode(paths.pop(0))
+                if audio is not None:
+                    tracks[mood].append(audio)
+                    used += audio.nbytes
+        for mood, loaded in tracks.items():
+            print(f"🎵 Loaded {len(loaded)}/{len(self.files[mood])} audio files for '{mood}' mood")
+        print(f"🎵 {used / 1024 / 1024:.0f} MB of decoded music in memory")
+        return tracks
+
+    def render(self, frames):
+        """Mix the next `frames` frames; called from the audio sink"""
+        out = np.zeros((frames, MUSIC_CHANNELS), dtype=np.float32)
+        with self.lock:
+            for voice in self.voices:
+                voice.render(out)
+            self.voices = [v for v in self.voices if not v.finished()]
+        out *= self.volume
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+    def _fade_in(self, audio):
+        ramp = int(self.crossfade * self.sample_rate)
+        with self.lock:
+            for voice in self.voices:
+                voice.fade_to(0.0, ramp)
+            if audio is not None:
+                self.voices.append(_Voice(audio, 0.0, 1.0, ramp))
+
+    def _pick(self, mood):
+        if self.tracks.get(mood):
+            return random.choice(self.tracks[mood])
+        if self.files.get(mood):
+            # Over budget: decode here, on the switch thread, never on the caller's
+            return self._decode(random.choice(self.files[mood]))
+        return None
+
+    def _switcher(self):
+        while True:
+            with self.changed:
+                while self.pending is None and self.running:
+                    self.changed.wait()
+                if not self.running:
+                    return
+                mood, requested_at = self.pending
+                self.pending = None
+
+            audio = self._pick(mood)
+            if audio is None:
+                print(f"⚠️  No audio files found for '{mood}' mood")
+            else:
+                print(f"🎵 Playing '{mood}' music ({len(audio) / self.sample_rate:.0f}s loop)")
+            self._fade_in(audio)
+            self.switches += 1
+            latency = time.monotonic() - requested_at
+            self.switch_latency.record(latency)
+            metrics.observe("music_switch", latency)
+
+    def play_mood(self, mood):
+        """Crossfade to music for `mood`; returns immediately"""
+        if mood == self.current_mood:
+            return  # Already playing this mood
+        self.current_mood = mood
+        with self.changed:
+            self.pending = (mood, time.monotonic())  # Latest mood wins
+            self.changed.notify()
+
+    def stop(self):
+        """Stop music playback"""
+        with self.changed:
+            self.running = False
+            self.changed.notify()
+        self.sink.stop()
+        with self.lock:
+            self.voices = []
+        self.current_mood = None
+
+    def print_stats(self):
+        s = self.switch_latency.summary()
+        print(f"🎵 Music: {self.switches} switches, switch p50={s['p50'] * 1000:.0f}ms "
+              f"p95={s['p95'] * 1000:.0f}ms, crossfade {self.crossfade}s")
@@ -0,0 +1,78 @@
+import threading
+import time
+
+# Configuration
+LEAD_SMOOTHING = 0.3  # Weight of the newest apply latency in the running estimate
+MAX_LEAD = 2.0  # Never fire more than this many seconds early
+
+def compress_timeline(mood_timeline):
+    """Collapse per-segment moods into change points: [{'at', 'mood', 'text'}]"""
+    changes = []
+    current_mood = None
+    for entry in mood_timeline:
+        if entry['mood'] != current_mood:
+            changes.append({'at': entry['start'], 'mood': entry['mood'], 'text': entry['text']})
+            current_mood = entry['mood']
+    return changes
+
+class MoodSchedulePlayer:
+    """Fire mood changes at absolute offsets from a monotonic anchor, so apply latency never accumulates"""
+
+    def __init__(self, apply, fire_early=True, initial_lead=0.0):
+        self.apply = apply  # callable(mood)
+        self.fire_early = fire_early
+        self.lead = initial_lead  # Estimated apply latency, subtracted from fire time
+        self.stop_event = threading.Event()
+        self.log = []  # {'at', 'mood', 'fire_skew', 'applied_skew', 'latency'}
+
+    def stop(self):
+        self.stop_event.set()
+
+    def play(self, changes, anchor=None):
+        """Block until every change has fired (or stop() is called). anchor defaults to now"""
+        anchor = time.monotonic() if anchor is None else anchor
+        skipped = 0
+
+        for i, change in enumerate(changes):
+            due = anchor + change['at']
+            # Running late: if the next change is already due too, skip straight to it
+            if i + 1 < len(changes) and time.monotonic() >= anchor + changes[i + 1]['at']:
+                skipped += 1
+                continue
+
+            lead = min(self.lead, MAX_LEAD) if self.fire_early else 0.0
+            wait = due - lead - time.monotonic()
+            if wait > 0 and self.stop_event.wait(wait):
+                break
+            if self.stop_event.is_set():
+                break
+
+            fired = time.monotonic()
+            self.apply(change['mood'])
+            done = time.monotonic()
+            latency = done - fired
+            self.lead = latency if not self.log else (
+                LEAD_SMOOTHING * latency + (1 - LEAD_SMOOTHING) * self.lead)
+
+            entry = {
+                'at': change['at'],
+                'mood': change['mood'],
+                'fire_skew': fired - due,
+                'applied_skew': done - due,
+                'latency': latency,
+            }
+            self.log.append(entry)
+            print(f"[{change['at']:.1f}s] → {change['mood'].upper()} "
+                  f"(fired {entry['fire_skew'] * 1000:+.0f}ms, applied {entry['applied_skew'] * 1000:+.0f}ms)")
+
+        self.print_summary(skipped)
+        return self.log
+
+    def print_summary(self, skipped=0):
+        if not self.log:
+            return
+        applied = sorted(abs(e['applied_skew']) for e in self.log)
+        worst = max(self.log, key=lambda e: abs(e['applied_skew']))
+        print(f"⏱️  {len(self.log)} mood changes, {skipped} skipped as stale; "
+              f"|applied skew| p50={applied[len(applied) // 2] * 1000:.0f}ms "
+              f"max={abs(worst['applied_skew']) * 1000:.0f}ms at {worst['at']:.1f}s")
@@ -0,0 +1,94 @@
+import time
+
+# Configuration
+HALF_LIFE = 10.0  # Seconds for a mood's accumulated evidence to halve
+ENTER_THRESHOLD = 1.0  # Score a mood needs before it can take over
+SWITCH_MARGIN = 0.5  # ...and how far it must lead the current mood's score (hysteresis)
+MIN_DWELL = 10.0  # Seconds a mood is held before another one may replace it
+BIG_MOMENT = 2.5  # A challenger this strong ignores the dwell time
+NEUTRAL_TIMEOUT = 20.0  # Seconds without any mood cue before returning to neutral (old evidence is dropped)
+
+class MoodSmoother:
+    """
+    Sits between per-chunk mood detection and the actuators. Each detection adds to an
+    exponentially decaying score; the output mood only changes when a challenger clearly
+    leads, the current mood has been held for MIN_DWELL, or the viewer goes quiet for
+    NEUTRAL_TIMEOUT. Keyword-free chunks no longer snap straight back to neutral.
+    """
+
+    def __init__(self, neutral="neutral", half_life=HALF_LIFE, enter_threshold=ENTER_THRESHOLD,
+                 switch_margin=SWITCH_MARGIN, min_dwell=MIN_DWELL,
+                 big_moment=BIG_MOMENT, neutral_timeout=NEUTRAL_TIMEOUT, clock=time.monotonic):
+        self.neutral = neutral
+        self.half_life = half_life
+        self.enter_threshold = enter_threshold
+        self.switch_margin = switch_margin
+        self.min_dwell = min_dwell
+        self.big_moment = big_moment
+        self.neutral_timeout = neutral_timeout
+        self.clock = clock
+
+        now = clock()
+        self.scores = {}
+        self.current = neutral
+        self.since = now  # When the current mood was entered
+        self.last_cue = now  # Last non-neutral detection
+        self.updated = now
+        self.transitions = 0
+        self.suppressed = 0  # Detections that would have switched mood without smoothing
+
+    def _decay(self, now):
+        factor = 0.5 ** ((now - self.updated) / self.half_life)
+        for mood in self.scores:
+            self.scores[mood] *= factor
+        self.updated = now
+
+    def _switch(self, mood, now, reason):
+        print(f"🧭 {self.current} → {mood} ({reason})")
+        self.current = mood
+        self.since = now
+        self.transitions += 1
+
+    def update(self, detected, weight=1.0):
+        """Feed one chunk's detected mood ("neutral" = no cue); returns the smoothed mood"""
+        now = self.clock()
+        self._decay(now)
+        if detected != self.neutral:
+            self.scores[detected] = self.scores.get(detected, 0.0) + weight
+            self.last_cue = now
+
+        before = self.current
+        self._decide(now)
+        if self.current == before and detected != before:
+            self.suppressed += 1
+        return self.current
+
+    def tick(self):
+        """Advance time without a detection (silence); returns the smoothed mood"""
+        now = self.clock()
+        self._decay(now)
+        self._decide(now)
+        return self.current
+
+    def _decide(self, now):
+        current_score = self.scores.get(self.current, 0.0)
+        if self.scores:
+            leader = max(self.scores, key=self.scores.get)
+            score = self.scores[leader]
+            if (leader != self.current and score >= self.enter_threshold
+                    and score >= current_score + self.switch_margin):
+                if now - self.since >= self.min_dwell or self.current == self.neutral:
+                    self._switch(leader, now, f"score {score:.1f}")
+                    return
+                if score >= self.big_moment:
+                    self._switch(leader, now, f"big moment, score {score:.1f}")
+                    return
+
+        if self.current != self.neutral and now - self.last_cue >= self.neutral_timeout:
+            # Clear the stale scores too, or a still-high one would switch straight back
+            self.scores.clear()
+            self._switch(self.neutral, now, f"no cues for {now - self.last_cue:.0f}s")
+
+    def print_stats(self):
+        print(f"🧭 Mood smoothing: {self.transitions} transitions, {self.suppressed} suppressed, "
+              f"holding '{self.current}' for {self.clock() - self.since:.0f}s")
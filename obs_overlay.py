@@ -0,0 +1,152 @@
+import glob
+import os
+import struct
+import tempfile
+import time
+import zlib
+import metrics
+
+# Configuration
+LINK_MODE = None  # None: write preloaded bytes; "hardlink" / "symlink": flip a link to mood_images/<mood>.png
+REPLACE_RETRIES = 5  # Windows refuses os.replace while OBS has the file open; retry briefly
+REPLACE_RETRY_DELAY = 0.01
+
+def _blank_png():
+    """1x1 transparent PNG, shown instead of deleting the overlay when a mood has no image"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 6, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00\x00")) + chunk(b"IEND", b""))
+
+BLANK_PNG = _blank_png()
+
+def _replace(src, dst):
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# mkstemp creates files 0600; give swapped-in files the mode open() would (other readers: OBS, node_exporter)
+FILE_MODE = 0o666 & ~_umask()
+
+def _temp_path(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    return fd, tmp
+
+def write_atomic(path, data):
+    """Write bytes to a temp file next to `path`, then swap it in with one rename"""
+    fd, tmp = _temp_path(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, FILE_MODE)
+        _replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def link_atomic(source, path, symbolic=False):
+    """Point `path` at `source` with a link + rename, so a switch copies no image bytes"""
+    fd, tmp = _temp_path(path)
+    os.close(fd)
+    os.remove(tmp)
+    try:
+        if symbolic:
+            os.symlink(os.path.abspath(source), tmp)
+        else:
+            os.link(source, tmp)
+        _replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+class ObsOverlayPublisher:
+    """Text + image overlay files for OBS, swapped atomically and only when they change"""
+
+    def __init__(self, text_file, image_file, images_folder, link_mode=LINK_MODE):
+        self.text_file = text_file
+        self.image_file = image_file
+        self.images_folder = images_folder
+        self.link_mode = link_mode
+        self.images = self._load_images()
+        self.published = {}  # path -> what it currently holds (bytes, or the image it links to)
+        self.counts = {"writes": 0, "links": 0, "skipped": 0}
+
+    def _load_images(self):
+        """Read every mood image once so a switch never touches the source files"""
+        images = {}
+        for path in sorted(glob.glob(os.path.join(self.images_folder, "*.png"))):
+            with open(path, 'rb') as f:
+                images[os.path.splitext(os.path.basename(path))[0]] = f.read()
+        if images:
+            print(f"🖼️  Preloaded {len(images)} overlay images from {self.images_folder}")
+        else:
+            print(f"⚠️  No overlay images in '{self.images_folder}'")
+        return images
+
+    def _current(self, path):
+        """Bytes already on disk, so a restart with the same mood doesn't rewrite anything"""
+        if path not in self.published:
+            try:
+                with open(path, 'rb') as f:
+                    self.published[path] = f.read()
+            except OSError:
+                self.published[path] = None
+        return self.published[path]
+
+    def _write(self, path, data):
+        if self._current(path) == data:
+            self.counts["skipped"] += 1
+            return False
+        write_atomic(path, data)
+        self.published[path] = data
+        self.counts["writes"] += 1
+        return True
+
+    def _link(self, path, mood):
+        source = os.path.join(self.images_folder, f"{mood}.png")
+        if self.published.get(path) == source:
+            self.counts["skipped"] += 1
+            return False
+        try:
+            link_atomic(source, path, symbolic=self.link_mode == "symlink")
+        except (OSError, NotImplementedError) as e:
+            print(f"⚠️  Could not {self.link_mode} overlay ({e}), copying bytes instead")
+            self.link_mode = None
+            return self._write(path, self.images[mood])
+        self.published[path] = source
+        self.counts["links"] += 1
+        return True
+
+    def publish(self, mood):
+        """Show `mood` in both overlays"""
+        with metrics.span("overlay_write"):
+            self._publish(mood)
+
+    def _publish(self, mood):
+        self._write(self.text_file, mood.upper().encode())
+
+        if mood not in self.images:
+            print(f"⚠️  Image not found: {os.path.join(self.images_folder, mood + '.png')}")
+            self._write(self.image_file, BLANK_PNG)
+            return
+        changed = self._link(self.image_file, mood) if self.link_mode else self._write(self.image_file, self.images[mood])
+        if changed:
+            print(f"🖼️  Updated overlay image to {mood}.png")
+
+    def print_stats(self):
+        c = self.counts
+        print(f"🖼️  Overlays: {c['writes']} writes, {c['links']} link flips, {c['skipped']} unchanged skipped")
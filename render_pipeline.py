@@ -0,0 +1,135 @@
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import cv2
+
+# Configuration
+RENDER_WORKERS = max(1, (os.cpu_count() or 2) - 2)  # Leave cores for decode/encode
+QUEUE_FRAMES_PER_WORKER = 4  # Bounded frame queues keep memory flat
+FFMPEG_PRESET = "veryfast"
+
+class OpenCVEncoder:
+    """mp4v via cv2.VideoWriter (video only)"""
+
+    def __init__(self, output_path, fps, width, height, source_path=None):
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        self.out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+    def write(self, frame):
+        self.out.write(frame)
+
+    def close(self):
+        self.out.release()
+
+class FFmpegEncoder:
+    """Pipe raw BGR frames to an ffmpeg x264 subprocess, copying the source audio if present"""
+
+    def __init__(self, output_path, fps, width, height, source_path=None):
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+        ]
+        if source_path:
+            cmd += ['-i', source_path, '-map', '0:v', '-map', '1:a?', '-c:a', 'aac']
+        cmd += ['-c:v', 'libx264', '-preset', FFMPEG_PRESET, '-pix_fmt', 'yuv420p', output_path]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.proc.stdin.write(frame.tobytes())
+
+    def close(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            print(f"❌ ffmpeg exited with code {self.proc.returncode}")
+
+ENCODERS = {"opencv": OpenCVEncoder, "ffmpeg": FFmpegEncoder}
+
+def render_video(video_path, output_path, annotate, apply, workers=RENDER_WORKERS, encoder="opencv"):
+    """
+    Decode → N workers → encode, preserving frame order.
+
+    annotate(frame_index, fps) runs on the decoder thread, in order, and returns a job
+    (None to pass the frame through). apply(frame, job) runs on a worker thread.
+    """
+    if encoder == "ffmpeg" and not shutil.which("ffmpeg"):
+        print("⚠️  ffmpeg not found, falling back to OpenCV encoder")
+        encoder = "opencv"
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    writer = ENCODERS[encoder](output_path, fps, width, height, source_path=video_path)
+
+    in_queue = queue.Queue(maxsize=workers * QUEUE_FRAMES_PER_WORKER)
+    out_queue = queue.Queue(maxsize=workers * QUEUE_FRAMES_PER_WORKER)
+    errors = []
+
+    def decode():
+        index = 0
+        try:
+            while cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                in_queue.put((index, frame, annotate(index, fps)))
+                index += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            cap.release()
+            for _ in range(workers):
+                in_queue.put(None)
+
+    def work():
+        while True:
+            item = in_queue.get()
+            if item is None:
+                out_queue.put(None)
+                return
+            index, frame, job = item
+            if job is not None:
+                try:
+                    apply(frame, job)
+                except Exception as e:
+                    errors.append(e)
+            out_queue.put((index, frame))
+
+    threads = [threading.Thread(target=decode, name="decode", daemon=True)]
+    threads += [threading.Thread(target=work, name=f"overlay-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    # Encode on this thread, reordering frames that finished out of order
+    start = time.monotonic()
+    pending = {}
+    next_index = 0
+    finished = 0
+    while finished < workers:
+        item = out_queue.get()
+        if item is None:
+            finished += 1
+            continue
+        pending[item[0]] = item[1]
+        while next_index in pending:
+            writer.write(pending.pop(next_index))
+            next_index += 1
+            if next_index % 100 == 0:
+                print(f"Processed {next_index} frames...")
+
+    writer.close()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+    elapsed = time.monotonic() - start
+    render_fps = next_index / elapsed if elapsed > 0 else 0.0
+    speed = render_fps / fps if fps else 0.0
+    print(f"⏱️  Rendered {next_index} frames in {elapsed:.1f}s "
+          f"({render_fps:.1f} fps, {speed:.2f}x real time, {workers} workers, {encoder})")
+    return next_index, elapsed
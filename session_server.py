@@ -0,0 +1,225 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import argparse
+import socketserver
+import threading
+import time
+import numpy as np
+from audio_ingest import stream_audio
+from daydream_client import DaydreamClient, UNCHANGED
+from inference_scheduler import InferenceScheduler
+from live_audio import PushRecorder
+from live_pipeline import StageStats
+from mood_dispatcher import MoodDispatcher
+from mood_smoother import MoodSmoother
+from vdm_music_image import MOOD_KEYWORDS, MOOD_MATCHER, MOOD_STYLES
+from whisper_registry import get_model
+
+# Configuration
+DAYDREAM_API_KEY = os.getenv("DAYDREAM_API_KEY")
+PIPELINE_ID = "pip_SD-turbo"
+WHISPER_MODEL = "base"
+SAMPLE_RATE = 16000
+CHUNK_DURATION = 5
+LIVE_PROFILE = "keyword"
+MAX_BATCH = 8  # Chunks from different sessions encoded together
+MAX_WAIT = 0.05  # Seconds a chunk waits for others to join its batch
+INGEST_HOST = "127.0.0.1"  # Unauthenticated: every connection opens a stream on your Daydream key
+INGEST_PORT = 9000  # TCP: "<session id>\n" then raw float32le 16 kHz mono PCM
+FEED_BLOCK = 0.5  # Seconds per block when replaying files
+STATS_INTERVAL = 30
+
+class ViewerSession:
+    """One viewer: audio input, mood state and Daydream stream, sharing the process-wide model"""
+
+    def __init__(self, session_id, manager):
+        self.session_id = session_id
+        self.manager = manager
+        self.recorder = PushRecorder(SAMPLE_RATE)
+        self.stream_id = session_id
+        self.current_mood = None
+        self.smoother = MoodSmoother()
+        self.latency = StageStats()  # Chunk captured → mood decided
+        self.chunks = 0
+        self.thread = threading.Thread(target=self._loop, name=f"session:{session_id}", daemon=True)
+
+    def start(self):
+        daydream = self.manager.daydream
+        if daydream:
+            response = daydream.create_stream(PIPELINE_ID)
+            if response is None or response.status_code not in (200, 201):
+                print(f"❌ [{self.session_id}] Could not create Daydream stream")
+                return False
+            stream = response.json()
+            self.stream_id = stream['id']
+            print(f"✓ [{self.session_id}] Stream {self.stream_id}, WHIP: {stream['whip_url']}")
+        self.recorder.start_recording()
+        self._set_mood("neutral")
+        self.thread.start()
+        return True
+
+    def _set_mood(self, mood):
+        if mood != self.current_mood:
+            print(f"🎨 [{self.session_id}] {self.current_mood} → {mood}")
+            self.current_mood = mood
+            self.manager.dispatcher.submit(self.stream_id, mood)
+
+    def _loop(self):
+        try:
+            while True:
+                chunk = self.recorder.get_audio_chunk(CHUNK_DURATION)
+                if chunk is None:
+                    if not self.recorder.is_recording:
+                        break
+                    continue
+                captured_at = time.monotonic()
+                text = self.manager.scheduler.submit(chunk).result()
+                self.chunks += 1
+                if text:
+                    self._set_mood(self.smoother.update(MOOD_MATCHER.best_mood(text) or "neutral"))
+                else:
+                    self._set_mood(self.smoother.tick())
+                self.latency.record(time.monotonic() - captured_at)
+        except Exception as e:
+            print(f"❌ [{self.session_id}] Session failed: {e}")
+            self.recorder.stop_recording()
+        finally:
+            self.manager.dispatcher.close(self.stream_id)
+            self.manager.remove(self.session_id)
+
+    def close(self):
+        """Stop accepting audio; buffered audio is still transcribed"""
+        self.recorder.stop_recording()
+
+class SessionManager:
+    """Many viewer sessions in one process, one shared Whisper model"""
+
+    def __init__(self, model, daydream=None, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.daydream = daydream
+        self.scheduler = InferenceScheduler(model, LIVE_PROFILE, MOOD_KEYWORDS, max_batch, max_wait)
+        self.dispatcher = MoodDispatcher(self._send_mood)
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def _send_mood(self, stream_id, mood):
+        if not self.daydream:
+            return True  # Dry run
+        response = self.daydream.update_stream(stream_id, MOOD_STYLES[mood], label=mood)
+        return response is UNCHANGED or (response is not None and response.status_code == 200)
+
+    def open(self, session_id):
+        with self.lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session {session_id} already exists")
+            session = self.sessions[session_id] = ViewerSession(session_id, self)
+        if not session.start():
+            self.remove(session_id)
+            return None
+        print(f"👤 Session '{session_id}' opened ({len(self.sessions)} active)")
+        return session
+
+    def remove(self, session_id):
+        with self.lock:
+            if self.sessions.pop(session_id, None):
+                print(f"👋 Session '{session_id}' closed ({len(self.sessions)} active)")
+
+    def feed_file(self, path, speed=1.0):
+        """Replay a media file as a session, paced at `speed` × real time"""
+        session = self.open(os.path.basename(path))
+        if session is None:
+            return
+
+        def feed():
+            start = time.monotonic()
+            fed = 0.0
+            try:
+                for block in stream_audio(path, FEED_BLOCK):
+                    session.recorder.push(block)
+                    fed += len(block) / SAMPLE_RATE
+                    ahead = start + fed / speed - time.monotonic()
+                    if ahead > 0:
+                        time.sleep(ahead)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+            finally:
+                session.close()
+
+        threading.Thread(target=feed, name=f"feed:{path}", daemon=True).start()
+
+    def serve(self, host=INGEST_HOST, port=INGEST_PORT):
+        """Accept network audio: each TCP connection is one session"""
+        manager = self
+
+        class IngestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                session_id = self.rfile.readline().decode(errors='replace').strip() or str(self.client_address)
+                try:
+                    session = manager.open(session_id)
+                except ValueError as e:
+                    print(f"⚠️  Rejected connection from {self.client_address[0]}: {e}")
+                    return
+                if session is None:
+                    return
+                leftover = b""
+                try:
+                    while True:
+                        data = self.rfile.read1(65536)
+                        if not data:
+                            break
+                        data = leftover + data
+                        usable = len(data) - len(data) % 4
+                        leftover = data[usable:]
+                        session.recorder.push(np.frombuffer(data[:usable], dtype=np.float32))
+                finally:
+                    session.close()
+
+        server = socketserver.ThreadingTCPServer((host, port), IngestHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📡 Audio ingest listening on tcp://{host}:{server.server_address[1]}")
+        return server
+
+    def print_stats(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+        print(f"📊 {len(sessions)} sessions")
+        for session in sessions:
+            s = session.latency.summary()
+            # current_mood is None while start() is still creating the stream
+            print(f"   {session.session_id:<20} mood={session.current_mood or '-':<9} chunks={session.chunks:<5} "
+                  f"p50={s['p50'] * 1000:6.0f}ms p95={s['p95'] * 1000:6.0f}ms")
+        self.scheduler.print_stats()
+        self.dispatcher.print_stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many viewer mood sessions from one process")
+    parser.add_argument("--host", default=INGEST_HOST,
+                        help="interface for audio ingest; anything but loopback lets others spend your Daydream quota")
+    parser.add_argument("--port", type=int, default=INGEST_PORT)
+    parser.add_argument("--files", nargs="*", default=[], help="replay these files as sessions")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed for --files")
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="1 disables batching")
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT, help="seconds to fill a batch")
+    parser.add_argument("--dry-run", action="store_true", help="don't create or patch Daydream streams")
+    args = parser.parse_args()
+
+    daydream = None if args.dry_run else DaydreamClient(DAYDREAM_API_KEY)
+    manager = SessionManager(get_model(args.model), daydream, args.max_batch, args.max_wait)
+    manager.serve(args.host, args.port)
+    for path in args.files:
+        manager.feed_file(path, args.speed)
+
+    try:
+        while True:
+            time.sleep(STATS_INTERVAL)
+            manager.print_stats()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping...")
+        manager.print_stats()
+        manager.dispatcher.stop()
+        manager.scheduler.stop()
+
+if __name__ == "__main__":
+    main()
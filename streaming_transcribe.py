@@ -0,0 +1,114 @@
+import re
+import numpy as np
+
+# Configuration
+WINDOW_DURATION = 3.0  # Seconds of audio Whisper sees per step
+HOP_DURATION = 1.0  # Seconds between steps
+VAD_FRAME = 0.03  # Seconds per energy frame
+VAD_THRESHOLD_DB = -45.0  # Frames louder than this (dBFS) count as voiced
+VAD_MIN_VOICED = 0.1  # Fraction of voiced frames needed to run Whisper
+CONTEXT_WORDS = 4  # Committed words carried into the next emission (>= longest keyword phrase - 1)
+
+def is_speech(audio, sample_rate, threshold_db=VAD_THRESHOLD_DB, min_voiced=VAD_MIN_VOICED):
+    """Cheap energy-based voice activity check"""
+    frame = max(1, int(sample_rate * VAD_FRAME))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return False
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    db = 20 * np.log10(rms)
+    return np.mean(db > threshold_db) >= min_voiced
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+class StableText(str):
+    """Newly committed words, plus the words committed just before them as `context`"""
+
+    def __new__(cls, text, context=""):
+        self = super().__new__(cls, text)
+        self.context = context
+        return self
+
+class StreamingTranscriber:
+    """Transcribe overlapping windows and emit only words two consecutive windows agree on"""
+
+    def __init__(self, recorder, model, window=WINDOW_DURATION, hop=HOP_DURATION, decode_options=None,
+                 context_words=CONTEXT_WORDS):
+        self.recorder = recorder
+        self.model = model
+        self.window = window
+        self.hop = hop
+        # Word timestamps drive stabilization, so timestamp-free decoding is not an option here
+        self.decode_options = dict(decode_options or {"beam_size": 5})
+        self.decode_options.pop("without_timestamps", None)
+        self.decode_options.update(word_timestamps=True, condition_on_previous_text=False)
+        self.sample_rate = recorder.sample_rate
+        self.committed_until = 0.0  # Absolute time (s) of the last emitted word end
+        self.hypothesis = []  # Uncommitted (start, end, word) from the previous window
+        self.last_end = None
+        self.context_words = context_words
+        self.tail = []  # Last committed words, so a phrase split across two commits still matches
+        self.skipped_windows = 0
+        self.transcribed_windows = 0
+
+    def next_window(self):
+        """Capture step: block until the next hop is available"""
+        return self.recorder.get_window(self.window, self.hop)
+
+    def _commit(self, words):
+        if not words:
+            return None
+        self.committed_until = words[-1][1]
+        text = StableText(" ".join(w[2] for w in words), " ".join(self.tail))
+        if self.context_words:
+            self.tail = (self.tail + [w[2] for w in words])[-self.context_words:]
+        return text
+
+    def transcribe_window(self, item):
+        """Transcribe one window; return newly stable text, or None if nothing new"""
+        end_sample, audio = item
+        end_time = end_sample / self.sample_rate
+        start_time = end_time - len(audio) / self.sample_rate
+
+        # A gap means the previous hypothesis will never be confirmed, so flush it
+        flushed = []
+        if self.last_end is not None and end_sample - self.last_end > int(self.hop * self.sample_rate):
+            flushed, self.hypothesis = self.hypothesis, []
+        self.last_end = end_sample
+
+        if not is_speech(audio, self.sample_rate):
+            self.skipped_windows += 1
+            flushed, self.hypothesis = flushed + self.hypothesis, []
+            return self._commit(flushed)
+
+        self.transcribed_windows += 1
+        segments, info = self.model.transcribe(
+            np.ascontiguousarray(audio, dtype=np.float32), **self.decode_options
+        )
+        current = []
+        for segment in segments:
+            for w in segment.words or []:
+                word = _normalize(w.word)
+                if word and start_time + w.end > self.committed_until:
+                    current.append((start_time + w.start, start_time + w.end, word))
+
+        # Local agreement: commit the common prefix of the last two hypotheses
+        stable = list(flushed)
+        agreed = 0
+        while (agreed < len(current) and agreed < len(self.hypothesis)
+               and current[agreed][2] == self.hypothesis[agreed][2]):
+            agreed += 1
+        stable += current[:agreed]
+        pending = current[agreed:]
+
+        # Words about to slide out of the window will not get a second opinion
+        # (while the first window is still filling, nothing slides out yet)
+        next_start = end_time + self.hop - self.window
+        while pending and pending[0][0] < next_start:
+            stable.append(pending.pop(0))
+
+        self.hypothesis = pending
+        return self._commit(stable)
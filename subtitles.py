@@ -0,0 +1,72 @@
+import subprocess
+
+# Configuration
+ASS_FONT = "Arial"
+ASS_FONT_SIZE = 24
+FFMPEG_PRESET = "veryfast"
+
+def _srt_time(seconds):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+def _ass_time(seconds):
+    centis = int(round(seconds * 100))
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+def write_srt(transcriptions, path):
+    """Write Whisper segments as an SRT file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, trans in enumerate(t for t in transcriptions if t['text'].strip()):
+            f.write(f"{i + 1}\n")
+            f.write(f"{_srt_time(trans['start'])} --> {_srt_time(trans['end'])}\n")
+            f.write(f"{trans['text'].strip()}\n\n")
+    return path
+
+def write_ass(transcriptions, path, width, height):
+    """Write Whisper segments as ASS styled like the OpenCV overlay (white on a black box, bottom left)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[Script Info]\nScriptType: v4.00+\n")
+        f.write(f"PlayResX: {width}\nPlayResY: {height}\n\n")
+        f.write("[V4+ Styles]\n")
+        f.write("Format: Name, Fontname, Fontsize, PrimaryColour, OutlineColour, BackColour, "
+                "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV\n")
+        # BorderStyle 3 = opaque box behind the text, Alignment 1 = bottom left
+        f.write(f"Style: Caption,{ASS_FONT},{ASS_FONT_SIZE},&H00FFFFFF,&H00000000,&H00000000,"
+                f"3,5,0,1,15,15,20\n\n")
+        f.write("[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+        for trans in transcriptions:
+            text = trans['text'].strip().replace("\n", "\\N").replace("{", "(").replace("}", ")")
+            if text:
+                f.write(f"Dialogue: 0,{_ass_time(trans['start'])},{_ass_time(trans['end'])},Caption,,0,0,0,,{text}\n")
+    return path
+
+def _filter_path(path):
+    """Escape a path for use inside an ffmpeg filter argument"""
+    return path.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+def burn_subtitles(video_path, subtitle_path, output_path):
+    """Burn subtitles in with one ffmpeg encode pass (audio stream copied)"""
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error', '-i', video_path,
+        '-vf', f"subtitles='{_filter_path(subtitle_path)}'",
+        '-c:v', 'libx264', '-preset', FFMPEG_PRESET, '-c:a', 'copy',
+        output_path
+    ]
+    return subprocess.run(cmd).returncode == 0
+
+def mux_soft_subtitles(video_path, subtitle_path, output_path):
+    """Add subtitles as a soft track with no re-encode (stream copy)"""
+    codec = 'mov_text' if output_path.lower().endswith(('.mp4', '.m4v', '.mov')) else 'srt'
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error', '-i', video_path, '-i', subtitle_path,
+        '-map', '0:v', '-map', '0:a?', '-map', '1:0',
+        '-c:v', 'copy', '-c:a', 'copy', '-c:s', codec,
+        output_path
+    ]
+    return subprocess.run(cmd).returncode == 0
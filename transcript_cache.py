@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+
+# Configuration
+CACHE_DIR = ".transcript_cache"
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # Evict least recently used transcripts beyond this
+HASH_BLOCK = 1024 * 1024
+HASH_INDEX = "file_hashes.json"
+
+class TranscriptCache:
+    """On-disk transcripts keyed by media content hash + transcription settings, LRU by size"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, HASH_INDEX)
+        self.hash_index = self._load_json(self.index_path) or {}
+
+    @staticmethod
+    def _load_json(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path, data):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def file_hash(self, path):
+        """SHA-256 of the file, memoised by (size, mtime) so unchanged files aren't re-read"""
+        st = os.stat(path)
+        abs_path = os.path.abspath(path)
+        memo = self.hash_index.get(abs_path)
+        if memo and memo['size'] == st.st_size and memo['mtime_ns'] == st.st_mtime_ns:
+            return memo['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+        sha = digest.hexdigest()
+
+        with self.lock:
+            self.hash_index[abs_path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha}
+            self._write_json(self.index_path, self.hash_index)
+        return sha
+
+    def key(self, path, settings):
+        """Cache key: content hash + canonical JSON of the settings"""
+        canonical = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+        settings_hash = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        return f"{self.file_hash(path)}-{settings_hash}"
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, path, settings):
+        """Cached transcriptions for this file and settings, or None"""
+        entry = self._entry_path(self.key(path, settings))
+        data = self._load_json(entry)
+        if data is None:
+            return None
+        try:
+            os.utime(entry)  # Mark as recently used
+        except OSError:
+            pass
+        return data['transcriptions']
+
+    def put(self, path, settings, transcriptions):
+        """Store transcriptions, then evict least recently used entries over the size budget"""
+        key = self.key(path, settings)
+        self._write_json(self._entry_path(key), {
+            'source': os.path.abspath(path),
+            'settings': settings,
+            'transcriptions': transcriptions
+        })
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json") and name != HASH_INDEX:
+                full = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, full))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(full)
+                total -= size
+            except OSError:
+                pass
+
+    def transcribe(self, path, settings, transcribe_fn):
+        """Return cached transcriptions, or run transcribe_fn(path) and cache its result"""
+        cached = self.get(path, settings)
+        if cached is not None:
+            print(f"⚡ Using cached transcript for {path}")
+            return cached
+        transcriptions = transcribe_fn(path)
+        self.put(path, settings, transcriptions)
+        return transcriptions
@@ -1,27 +1,39 @@
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
-import requests
 import time
-import queue
 import threading
-import sounddevice as sd
-import numpy as np
-from faster_whisper import WhisperModel
-import wave
-import pygame
-import random
-import shutil
+from whisper_registry import get_model
+from live_audio import AudioRecorder, transcribe_chunk
+from keyword_spotter import KeywordSpotter, SPOTTER_MODEL
+from mood_matcher import MoodMatcher
+from daydream_client import DaydreamClient, UNCHANGED
+from mood_dispatcher import MoodDispatcher
+import metrics
+from mood_smoother import MoodSmoother
+from mood_music import MoodMusicEngine
+from live_pipeline import LivePipeline
+from streaming_transcribe import StreamingTranscriber
+from decoding_profiles import whisper_options
+from obs_overlay import ObsOverlayPublisher
 
 # Configuration
 DAYDREAM_API_KEY = os.getenv("DAYDREAM_API_KEY")
 WHISPER_MODEL = "base"
 SAMPLE_RATE = 16000
 CHUNK_DURATION = 5  # Process audio every 5 seconds
+LIVE_PROFILE = "keyword"  # Decoding profile: accurate, greedy, keyword or adaptive (see decoding_profiles.py)
+KWS_FRONT_END = True  # Chunk mode: screen with VAD + Whisper tiny, run WHISPER_MODEL only on likely mood cues
+STREAMING_MODE = True  # Rolling 3s window / 1s hop with VAD instead of fixed chunks
+WINDOW_DURATION = 3
+HOP_DURATION = 1
+STATS_INTERVAL = 30  # Seconds between pipeline timing reports
 AUDIO_FOLDER = "incredibles_audio"  # Folder with mood music files
+MUSIC_CROSSFADE = 1.5  # Seconds of overlap between mood tracks
 MOOD_IMAGES_FOLDER = "mood_images"  # Folder with mood images (excited.png, sad.png, etc.)
 MOOD_TEXT_FILE = "current_mood.txt"  # Text file for OBS
 MOOD_IMAGE_FILE = "current_mood.png"  # Image file for OBS
+OVERLAY_LINK_MODE = None  # "hardlink" or "symlink" flips a link instead of writing image bytes
 
 # Mood-based visual styles
 MOOD_STYLES = {
@@ -60,149 +72,31 @@ MOOD_KEYWORDS = {
     "terrible": ["unfortunate", "terrible", "awful"]
 }
 
-class AudioRecorder:
-    def __init__(self):
-        self.audio_queue = queue.Queue()
-        self.is_recording = False
-        
-    def callback(self, indata, frames, time, status):
-        """Callback for audio stream"""
-        if status:
-            print(f"Audio status: {status}")
-        self.audio_queue.put(indata.copy())
-    
-    def start_recording(self):
-        """Start recording from microphone"""
-        self.is_recording = True
-        self.stream = sd.InputStream(
-            samplerate=SAMPLE_RATE,
-            channels=1,
-            callback=self.callback,
-            blocksize=int(SAMPLE_RATE * 0.5)  # 0.5 second blocks
-        )
-        self.stream.start()
-        print("🎤 Microphone recording started")
-    
-    def stop_recording(self):
-        """Stop recording"""
-        self.is_recording = False
-        if hasattr(self, 'stream'):
-            self.stream.stop()
-            self.stream.close()
-        print("🎤 Microphone recording stopped")
-    
-    def get_audio_chunk(self, duration):
-        """Get audio data for specified duration"""
-        frames = []
-        num_frames = int(SAMPLE_RATE * duration / (SAMPLE_RATE * 0.5))
-        
-        for _ in range(num_frames):
-            try:
-                data = self.audio_queue.get(timeout=1)
-                frames.append(data)
-            except queue.Empty:
-                break
-        
-        if frames:
-            return np.concatenate(frames)
-        return None
+# Compiled once at startup; word-boundary and phrase aware
+MOOD_MATCHER = MoodMatcher(MOOD_KEYWORDS)
 
-class MoodMusicPlayer:
-    def __init__(self, audio_folder):
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-        pygame.mixer.music.set_volume(0.5)  # 50% volume
-        self.audio_folder = audio_folder
-        self.current_mood = None
-        self.mood_files = self._load_mood_files()
-        
-    def _load_mood_files(self):
-        """Load audio files for each mood"""
-        mood_files = {}
-        
-        if not os.path.exists(self.audio_folder):
-            print(f"⚠️  Audio folder '{self.audio_folder}' not found. Music disabled.")
-            return mood_files
-        
-        for mood in MOOD_STYLES.keys():
-            mood_dir = os.path.join(self.audio_folder, mood)
-            if os.path.exists(mood_dir):
-                files = [f for f in os.listdir(mood_dir) 
-                        if f.endswith(('.mp3', '.wav', '.ogg'))]
-                if files:
-                    mood_files[mood] = [os.path.join(mood_dir, f) for f in files]
-                    print(f"🎵 Loaded {len(files)} audio files for '{mood}' mood")
-        
-        return mood_files
-    
-    def play_mood(self, mood):
-        """Play music for specified mood (loops until changed)"""
-        if mood == self.current_mood:
-            return  # Already playing this mood
-        
-        self.current_mood = mood
-        
-        if mood not in self.mood_files or not self.mood_files[mood]:
-            print(f"⚠️  No audio files found for '{mood}' mood")
-            pygame.mixer.music.stop()
-            return
-        
-        # Pick random song from mood folder
-        song = random.choice(self.mood_files[mood])
-        print(f"🎵 Playing: {os.path.basename(song)}")
-        
-        try:
-            pygame.mixer.music.load(song)
-            pygame.mixer.music.play(-1)  # -1 = loop forever
-        except Exception as e:
-            print(f"❌ Error playing audio: {e}")
-    
-    def stop(self):
-        """Stop music playback"""
-        pygame.mixer.music.stop()
-        self.current_mood = None
-
-def save_audio_chunk(audio_data, filename="temp_chunk.wav"):
-    """Save audio data to WAV file for Whisper"""
-    with wave.open(filename, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # 16-bit
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
-    return filename
-
-def transcribe_chunk(audio_file, model):
-    """Transcribe audio chunk"""
-    segments, info = model.transcribe(audio_file, beam_size=5)
-    
-    text = ""
-    for segment in segments:
-        text += segment.text.lower() + " "
-    
-    return text.strip()
+# Shared keep-alive session for every Daydream call
+DAYDREAM = DaydreamClient(DAYDREAM_API_KEY)
 
 def detect_mood_from_text(text):
     """Detect mood from transcribed text"""
     if not text:
         return "neutral"
     
-    for mood, keywords in MOOD_KEYWORDS.items():
-        if any(keyword in text for keyword in keywords):
-            print(f"🎯 Detected '{mood}' from: '{text}'")
-            return mood
+    # Streaming transcripts carry the words committed just before them, so split phrases still match
+    mood = MOOD_MATCHER.best_mood(text, getattr(text, "context", ""))
+    if mood:
+        print(f"🎯 Detected '{mood}' from: '{text}'")
+        return mood
     
     return "neutral"
 
 def create_daydream_stream(pipeline_id="pip_SD-turbo"):
     """Create a Daydream stream"""
-    url = "https://api.daydream.live/v1/streams"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {DAYDREAM_API_KEY}"
-    }
-    data = {"pipeline_id": pipeline_id}
-    
     print("Creating Daydream stream...")
-    response = requests.post(url, headers=headers, json=data)
+    response = DAYDREAM.create_stream(pipeline_id)
+    if response is None:
+        return None
     
     if response.status_code in [200, 201]:
         result = response.json()
@@ -217,16 +111,13 @@ def create_daydream_stream(pipeline_id="pip_SD-turbo"):
 
 def update_stream_mood(stream_id, mood):
     """Update Daydream stream with mood-based parameters"""
-    url = f"https://api.daydream.live/v1/streams/{stream_id}"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {DAYDREAM_API_KEY}"
-    }
-    
     style = MOOD_STYLES[mood]
-    data = {"params": style}
     
-    response = requests.patch(url, headers=headers, json=data)
+    response = DAYDREAM.update_stream(stream_id, style, label=mood)
+    if response is None:
+        return False
+    if response is UNCHANGED:
+        return True  # The stream already has this style
     
     if response.status_code == 200:
         print(f"✅ Stream updated to {mood.upper()} mood")
@@ -235,23 +126,6 @@ def update_stream_mood(stream_id, mood):
         print(f"❌ Error updating stream: {response.status_code}")
         return False
 
-def update_obs_overlays(mood):
-    """Update text and image files for OBS overlays"""
-    # Update text file
-    with open(MOOD_TEXT_FILE, 'w') as f:
-        f.write(mood.upper())
-    
-    # Update image file (copy mood-specific image to current_mood.png)
-    mood_image_path = os.path.join(MOOD_IMAGES_FOLDER, f"{mood}.png")
-    if os.path.exists(mood_image_path):
-        shutil.copy(mood_image_path, MOOD_IMAGE_FILE)
-        print(f"🖼️  Updated overlay image to {mood}.png")
-    else:
-        print(f"⚠️  Image not found: {mood_image_path}")
-        # Create blank image if none exists
-        if os.path.exists(MOOD_IMAGE_FILE):
-            os.remove(MOOD_IMAGE_FILE)
-
 def main():
     print("=" * 60)
     print("🎮 DAYDREAM LIVE REACTION-BASED VIDEO TRANSFORM")
@@ -285,14 +159,22 @@ def main():
     print("\n5. Click 'Start Streaming'")
     print(f"6. Open in browser: https://lvpr.tv/?v={stream['output_playback_id']}")
     print("-" * 60)
+    # Load and warm up Whisper while the user sets up OBS
+    threading.Thread(target=get_model, args=(WHISPER_MODEL,), daemon=True).start()
+    use_spotter = KWS_FRONT_END and not STREAMING_MODE  # Streaming mode has its own VAD gate
+    if use_spotter:
+        threading.Thread(target=get_model, args=(SPOTTER_MODEL,), daemon=True).start()
+    
     print("\nPress ENTER when OBS is streaming...")
     input()
     
     # Initialize
-    print("\n🔄 Loading Whisper model...")
-    model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
-    recorder = AudioRecorder()
-    music_player = MoodMusicPlayer(AUDIO_FOLDER)
+    model = get_model(WHISPER_MODEL)  # Returns once the background load/warm-up is done
+    spotter = KeywordSpotter(get_model(SPOTTER_MODEL), model, MOOD_KEYWORDS, SAMPLE_RATE,
+                             LIVE_PROFILE) if use_spotter else None
+    recorder = AudioRecorder(SAMPLE_RATE)
+    music_player = MoodMusicEngine(AUDIO_FOLDER, MOOD_STYLES, MUSIC_CROSSFADE)
+    overlays = ObsOverlayPublisher(MOOD_TEXT_FILE, MOOD_IMAGE_FILE, MOOD_IMAGES_FOLDER, OVERLAY_LINK_MODE)
     
     print("✓ Ready to listen to your reactions!\n")
     print("=" * 60)
@@ -302,49 +184,68 @@ def main():
     print("=" * 60)
     print()
     
+    # Optional hot-path metrics (LIVE_METRICS=jsonl:<path> or prom:<path>)
+    exporter = metrics.start_exporter()
+    
+    # Stream updates go out on a background thread, latest mood wins
+    dispatcher = MoodDispatcher(update_stream_mood)
+    # Hysteresis and dwell time between detection and the actuators
+    smoother = MoodSmoother()
+    
+    # Build the capture → transcribe → decide → actuate pipeline
+    if STREAMING_MODE:
+        streamer = StreamingTranscriber(recorder, model, WINDOW_DURATION, HOP_DURATION,
+                                        whisper_options(LIVE_PROFILE, MOOD_KEYWORDS),
+                                        context_words=MOOD_MATCHER.max_depth - 1)
+        capture, transcribe = streamer.next_window, streamer.transcribe_window
+        listening = f"{WINDOW_DURATION}s windows every {HOP_DURATION}s"
+    else:
+        capture = lambda: recorder.get_audio_chunk(CHUNK_DURATION)
+        if spotter:
+            transcribe = spotter.transcribe
+        else:
+            transcribe = lambda audio: transcribe_chunk(audio, model, LIVE_PROFILE, MOOD_KEYWORDS)
+        listening = f"{CHUNK_DURATION} second chunks"
+    
+    pipeline = LivePipeline(
+        capture,
+        transcribe,
+        detect_mood=lambda text: smoother.update(detect_mood_from_text(text)),
+        actuators={
+            "daydream": lambda mood: dispatcher.submit(stream_id, mood),
+            "overlay": overlays.publish,
+            "music": music_player.play_mood,
+        },
+        on_idle=smoother.tick,
+        capture_time=recorder.capture_time,  # ADC timestamps, so end-to-end latency includes buffering
+    )
+    pipeline.apply_mood("neutral")
+    
     # Start recording
     recorder.start_recording()
-    current_mood = "neutral"
-    update_stream_mood(stream_id, current_mood)
-    update_obs_overlays(current_mood)
-    music_player.play_mood(current_mood)
+    pipeline.start()
+    print(f"🎧 Listening in {listening}...")
     
     try:
         while True:
-            # Get audio chunk
-            print(f"🎧 Listening for {CHUNK_DURATION} seconds...")
-            audio_chunk = recorder.get_audio_chunk(CHUNK_DURATION)
-            
-            if audio_chunk is not None and len(audio_chunk) > 0:
-                # Save and transcribe
-                audio_file = save_audio_chunk(audio_chunk)
-                text = transcribe_chunk(audio_file, model)
-                
-                if text:
-                    print(f"💬 You said: '{text}'")
-                    
-                    # Detect mood
-                    new_mood = detect_mood_from_text(text)
-                    
-                    # Update if mood changed
-                    if new_mood != current_mood:
-                        print(f"\n🎨 Mood change: {current_mood} → {new_mood}")
-                        update_stream_mood(stream_id, new_mood)
-                        update_obs_overlays(new_mood)
-                        music_player.play_mood(new_mood)
-                        current_mood = new_mood
-                        print()
-                else:
-                    print("🔇 No speech detected")
-                
-                # Cleanup temp file
-                if os.path.exists(audio_file):
-                    os.remove(audio_file)
-            
-            time.sleep(0.5)
+            time.sleep(STATS_INTERVAL)
+            pipeline.print_stats()
+            recorder.print_stats()
+            DAYDREAM.print_stats()
+            DAYDREAM.print_transitions()
+            dispatcher.print_stats()
+            overlays.print_stats()
+            music_player.print_stats()
+            smoother.print_stats()
+            if spotter:
+                spotter.print_stats()
     
     except KeyboardInterrupt:
         print("\n\n🛑 Stopping...")
+        pipeline.stop()
+        dispatcher.stop()
+        if exporter:
+            exporter.stop()
         recorder.stop_recording()
         music_player.stop()
         print(f"\n✓ Stream ID: {stream_id}")
@@ -0,0 +1,63 @@
+import threading
+import time
+import numpy as np
+from faster_whisper import WhisperModel
+import metrics
+
+# Configuration
+DEFAULT_DEVICE = "cpu"
+DEFAULT_COMPUTE_TYPE = "int8"
+WARMUP_SECONDS = 1.0  # Length of the silent clip used to warm the model up
+SAMPLE_RATE = 16000
+
+_models = {}
+_metrics = {}  # key -> load and first-inference (warm-up) seconds
+_loading = {}  # key -> lock held while that model loads; other keys and cached lookups don't wait
+_lock = threading.Lock()  # Guards the two dicts only, never held through a load
+
+def _warm_up(model):
+    """Run one inference on silence so the first real chunk doesn't pay allocation/JIT costs"""
+    silence = np.zeros(int(SAMPLE_RATE * WARMUP_SECONDS), dtype=np.float32)
+    segments, info = model.transcribe(silence, beam_size=1, language="en")
+    list(segments)  # Segments are lazy; force the decode
+
+def get_model(size, device=DEFAULT_DEVICE, compute_type=DEFAULT_COMPUTE_TYPE, cpu_threads=0,
+              warm_up=True):
+    """Return the shared WhisperModel for these settings, loading (and warming) it once"""
+    key = (size, device, compute_type, cpu_threads)
+    with _lock:
+        if key in _models:
+            return _models[key]
+        key_lock = _loading.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _lock:
+            if key in _models:
+                return _models[key]  # Another thread finished loading it while we waited
+
+        print(f"🔄 Loading Whisper model '{size}' ({device}, {compute_type})...")
+        start = time.monotonic()
+        model = WhisperModel(size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        load_time = time.monotonic() - start
+
+        warmup_time = None
+        if warm_up:
+            start = time.monotonic()
+            _warm_up(model)
+            warmup_time = time.monotonic() - start
+
+        with _lock:
+            _models[key] = model
+            _metrics[key] = {"load_seconds": load_time, "warmup_seconds": warmup_time}
+            _loading.pop(key, None)
+        metrics.observe("whisper_load", load_time)
+        if warmup_time is not None:
+            metrics.observe("whisper_warmup", warmup_time)
+        warm = f", warm-up {warmup_time:.2f}s" if warmup_time is not None else ""
+        print(f"✓ Whisper '{size}' loaded in {load_time:.2f}s{warm}")
+        return model
+
+def model_metrics():
+    """Load and warm-up timings per loaded (size, device, compute_type, cpu_threads)"""
+    with _lock:
+        return {key: dict(timings) for key, timings in _metrics.items()}